@@ -0,0 +1,79 @@
+"""Benchmark of Query.export against building every model with Query.all() and serialising the list.
+
+Seeds a temporary SQLite file with a few million rows, then reports the time and the peak Python memory of each.
+
+    python -m benchmarks.export --rows 2000000 --format csv --with-all
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import src
+from benchmarks.run import BenchRow
+
+
+def seed(path: str, rows: int) -> src.Database:
+    db = src.SQLiteDatabase(src.DatabaseConfig(host=path, user="", password="", database=""))
+    db.create_table(BenchRow)
+    # Seeding through save would take far longer than the export that is being measured
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO benchrow (name, value, flag) VALUES (?, ?, ?)",
+            ((f"row {idx}", idx % 10, idx % 2 == 0) for idx in range(rows)),
+        )
+    return db
+
+
+def measure(func: Callable[[], Any]) -> dict[str, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 2**20}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", default="csv", choices=sorted(src.export.WRITERS))
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--with-all", action="store_true", help="Also measure Query.all() followed by a csv dump")
+    args = parser.parse_args(argv)
+
+    results: dict[str, Any] = {"rows": args.rows, "format": args.format}
+
+    def export() -> None:
+        with open(os.devnull, "w", encoding="utf-8") as file:
+            db.query(BenchRow).export(file, args.format, chunk_size=args.chunk_size)
+
+    def dump_all() -> None:
+        books = db.query(BenchRow).all()
+        csv.writer(io.StringIO()).writerows(tuple(book.to_dict().values()) for book in books)
+
+    # The database is removed with its directory once it is measured
+    with tempfile.TemporaryDirectory(prefix="orm_bench_") as tmp_dir:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            db = seed(os.path.join(tmp_dir, "export.db"), args.rows)
+            results["export"] = measure(export)
+            if args.with_all:
+                results["all"] = measure(dump_all)
+    json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
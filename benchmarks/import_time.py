@@ -0,0 +1,49 @@
+"""Benchmark of the time taken by `import src` in a fresh interpreter, and of which database drivers it loads.
+
+python -m benchmarks.import_time --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DRIVERS = ["psycopg2", "mysql.connector", "sqlite3"]
+
+
+def time_interpreter(code: str, repeat: int) -> float:
+    """Returns the median wall time of running the code in a new interpreter"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=os.getcwd())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    check_drivers = f"import sys, src; print(' '.join(d for d in {DRIVERS!r} if d in sys.modules))"
+    loaded = subprocess.run(
+        [sys.executable, "-c", check_drivers], check=True, capture_output=True, text=True
+    ).stdout.split()
+    startup = time_interpreter("pass", args.repeat)
+    results = {
+        "import_seconds": time_interpreter("import src", args.repeat) - startup,
+        "import_sqlite_seconds": time_interpreter("import src; src.SQLiteDatabase", args.repeat) - startup,
+        "drivers_loaded_by_import": loaded,
+    }
+    json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
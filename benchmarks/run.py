@@ -0,0 +1,240 @@
+"""Benchmarks for the ORM hot paths.
+
+Runs against SQLite on a temporary file by default. Postgres and MySQL are benchmarked when their hostnames are set
+in the environment, the same way the docker compose test setup configures them (see .env).
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from threading import Thread
+from typing import Any, Callable
+
+import src
+
+Benchmark = Callable[[src.Database, int], Callable[[], Any]]
+DatabaseFactory = Callable[[src.DatabaseConfig], src.Database]
+BENCHMARKS: dict[str, Benchmark] = {}
+MIN_SAMPLE_TIME = 0.05
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark. It sets up the database and returns the operation that is timed"""
+
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class BenchRow(src.BaseModel):
+    name: str = src.CharField(max_length=64)
+    value: int = src.IntField()
+    flag: bool = src.BoolField()
+
+
+def _seed(db: src.Database, rows: int) -> None:
+    db.create_table(BenchRow)
+    for idx in range(rows):
+        db.save(BenchRow(name=f"row {idx}", value=idx % 10, flag=idx % 2 == 0))
+
+
+@benchmark("single_save")
+def bench_single_save(db: src.Database, rows: int) -> Callable[[], Any]:
+    db.create_table(BenchRow)
+    return lambda: db.save(BenchRow(name="row", value=1, flag=True))
+
+
+@benchmark("bulk_insert")
+def bench_bulk_insert(db: src.Database, rows: int) -> Callable[[], Any]:
+    db.create_table(BenchRow)
+    batch = [(f"row {idx}", idx % 10, idx % 2 == 0) for idx in range(rows)]
+
+    def run() -> None:
+        for name, value, flag in batch:
+            db.save(BenchRow(name=name, value=value, flag=flag))
+
+    return run
+
+
+@benchmark("bulk_load")
+def bench_bulk_load(db: src.Database, rows: int) -> Callable[[], Any]:
+    db.create_table(BenchRow)
+    batch = [(f"row {idx}", idx % 10, idx % 2 == 0) for idx in range(rows)]
+    return lambda: db.load(BenchRow, batch)
+
+
+@benchmark("point_lookup")
+def bench_point_lookup(db: src.Database, rows: int) -> Callable[[], Any]:
+    _seed(db, rows)
+    return lambda: db.query(BenchRow).filter(id=rows // 2).first()
+
+
+@benchmark("full_scan")
+def bench_full_scan(db: src.Database, rows: int) -> Callable[[], Any]:
+    _seed(db, rows)
+    return lambda: db.query(BenchRow).all()
+
+
+@benchmark("filter_chain")
+def bench_filter_chain(db: src.Database, rows: int) -> Callable[[], Any]:
+    _seed(db, rows)
+
+    def run() -> None:
+        books = db.query(BenchRow).filter(flag=True)
+        len(books)
+        for value in range(10):
+            len(books.filter(value=value))
+
+    return run
+
+
+@benchmark("export")
+def bench_export(db: src.Database, rows: int) -> Callable[[], Any]:
+    _seed(db, rows)
+
+    def run() -> None:
+        with open(os.devnull, "w", encoding="utf-8") as file:
+            db.query(BenchRow).export(file)
+
+    return run
+
+
+@benchmark("concurrent_readers")
+def bench_concurrent_readers(db: src.Database, rows: int) -> Callable[[], Any]:
+    _seed(db, rows)
+
+    def run() -> None:
+        threads = [Thread(target=lambda: db.query(BenchRow).filter(value=3).all()) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return run
+
+
+def get_databases(maxconn: int, tmp_dir: str) -> dict[str, tuple[DatabaseFactory, src.DatabaseConfig]]:
+    databases: dict[str, tuple[DatabaseFactory, src.DatabaseConfig]] = {
+        "sqlite": (
+            src.SQLiteDatabase,
+            src.DatabaseConfig(host=os.path.join(tmp_dir, "bench.db"), user="", password="", database=""),
+        )
+    }
+    user, password, database = os.getenv("USER", ""), os.getenv("PASSWORD", ""), os.getenv("DATABASE", "")
+    for name, db_type, env_var in [
+        ("postgres", src.PostgresDatabase, "POSTGRES_HOSTNAME"),
+        ("mysql", src.MySQLDatabase, "MYSQL_HOSTNAME"),
+    ]:
+        if os.getenv(env_var):
+            config = src.DatabaseConfig(os.environ[env_var], user, password, database, maxconn=maxconn)
+            databases[name] = (db_type, config)
+    return databases
+
+
+def run_benchmark(
+    db_type: DatabaseFactory, config: src.DatabaseConfig, func: Benchmark, rows: int, repeat: int
+) -> dict[str, float]:
+    timings = []
+    number = 0
+    for _ in range(repeat):
+        db = db_type(config)
+        db._drop_tables(database=config.database)  # pylint: disable=W0212
+        operation = func(db, rows)
+        if not number:
+            # Fast operations are looped, like timeit does, so a sample isn't just timer noise
+            start = time.perf_counter()
+            operation()
+            number = max(1, int(MIN_SAMPLE_TIME / max(time.perf_counter() - start, 1e-9)))
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "repeat": repeat,
+        "number": number,
+        "rows": rows,
+    }
+
+
+def run(dialects: list[str], names: list[str], rows: int, repeat: int, maxconn: int) -> dict[str, Any]:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    # The SQLite database is removed with its directory once the run is done
+    with tempfile.TemporaryDirectory(prefix="orm_bench_") as tmp_dir:
+        for dialect, (db_type, config) in get_databases(maxconn, tmp_dir).items():
+            if dialects and dialect not in dialects:
+                continue
+            try:
+                db_type(config)
+            except Exception as ex:
+                print(f"Skipping {dialect}: {ex}", file=sys.stderr)
+                continue
+            results[dialect] = {}
+            for name in names:
+                # The dialects print every statement, which would swamp the results
+                with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+                    results[dialect][name] = run_benchmark(db_type, config, BENCHMARKS[name], rows, repeat)
+                print(f"{dialect:>10} {name:<20} {results[dialect][name]['median'] * 1000:10.2f} ms", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "time": time.time()},
+        "results": results,
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Returns the benchmarks whose median is more than the threshold slower than in the baseline"""
+    regressions = []
+    for dialect, benchmarks in results["results"].items():
+        for name, result in benchmarks.items():
+            base = baseline["results"].get(dialect, {}).get(name)
+            if not base:
+                continue
+            ratio = result["median"] / base["median"]
+            status = "REGRESSION" if ratio > 1 + threshold else "ok"
+            print(f"{dialect:>10} {name:<20} {ratio:8.2f}x  {status}", file=sys.stderr)
+            if status != "ok":
+                regressions.append(f"{dialect}.{name}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", action="append", default=[], choices=["sqlite", "postgres", "mysql"])
+    parser.add_argument("--benchmark", action="append", default=[], choices=sorted(BENCHMARKS))
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--maxconn", type=int, default=4)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Compare the results against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing a comparison")
+    args = parser.parse_args(argv)
+
+    results = run(args.dialect, args.benchmark or list(BENCHMARKS), args.rows, args.repeat, args.maxconn)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            return 1 if compare(results, json.load(file), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,61 @@
 # ruff: noqa: F401
 # pyright: reportUnusedImport=false
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from src.cache import QueryCache
 from src.database import Database, DatabaseConfig
-from src.dialects.mysql.database import MySQLDatabase
-from src.dialects.postgres.database import PostgresDatabase
-from src.dialects.sqlite.database import SQLiteDatabase
 from src.exceptions import (
     FeatureNotImplementedError,
     InvalidFieldError,
     InvalidFieldValueError,
     NoConnectionError,
+    NPlusOneQueryError,
+    NPlusOneQueryWarning,
+    QueryTimeoutError,
+    RelationNotLoadedError,
+    ShardKeyChangedError,
     ValueNotInitializedError,
+    WriterClosedError,
+)
+from src.export import export_rows, read_columnar
+from src.loader import read_rows
+from src.migration import BackfillProgress
+from src.mirror import Mirror
+from src.models.fields import (
+    BoolField,
+    BytesField,
+    CharField,
+    DateTimeField,
+    Field,
+    FloatField,
+    ForeignKey,
+    IntField,
+    RelatedField,
 )
-from src.models.fields import BoolField, CharField, Field, IntField
 from src.models.model import BaseModel, T
 from src.models.query import Query
+from src.profiler import NPlusOneDetector, Profiler, StatementProfile, StatementStats
+from src.registry import create_database, parse_database_url
+from src.sharding import ShardedDatabase
+from src.writer import BufferedWriter
+
+if TYPE_CHECKING:
+    from src.dialects.mysql.database import MySQLDatabase
+    from src.dialects.postgres.database import PostgresDatabase
+    from src.dialects.sqlite.database import SQLiteDatabase
+
+# Dialects are imported on first use, so a process only loads the database drivers it needs
+DIALECTS = {
+    "MySQLDatabase": "src.dialects.mysql.database",
+    "PostgresDatabase": "src.dialects.postgres.database",
+    "SQLiteDatabase": "src.dialects.sqlite.database",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in DIALECTS:
+        dialect = getattr(import_module(DIALECTS[name]), name)
+        globals()[name] = dialect
+        return dialect
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+CacheKey = tuple[Hashable, tuple[str, ...], tuple[tuple[str, Any], ...], int]
+
+
+class QueryCache:  # pylint: disable=R0902
+    """Process-wide LRU cache of raw result rows, with an optional time-to-live per entry. Tables are identified by
+    any hashable key, which databases sharing the cache qualify with their own identity"""
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, list[tuple[Any, ...]]]] = OrderedDict()
+        self._generations: dict[Hashable, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(table: Hashable, fields: list[str], criterion: dict[str, Any], limit: int) -> CacheKey | None:
+        """Returns the cache key for a select, or None if the criteria can't be hashed"""
+        criteria = tuple(sorted(criterion.items()))
+        if not all(isinstance(value, Hashable) for _, value in criteria):
+            return None
+        return table, tuple(fields), criteria, limit
+
+    def get(self, key: CacheKey) -> list[tuple[Any, ...]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, table: Hashable) -> tuple[int, int]:
+        """Returns a counter that changes whenever the table is invalidated"""
+        return self._epoch, self._generations.get(table, 0)
+
+    def set(self, key: CacheKey, rows: list[tuple[Any, ...]], generation: tuple[int, int]) -> None:
+        with self._lock:
+            # Rows read before a concurrent write was invalidated would be stale, so they are not stored
+            if self.generation(key[0]) != generation:
+                return
+            self._entries[key] = (time.monotonic(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: Hashable | None = None) -> None:
+        """Drop every entry for the table, or the whole cache if no table is given"""
+        with self._lock:
+            if table is None:
+                self._entries.clear()
+                self._epoch += 1
+                return
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [key for key in self._entries if key[0] == table]:
+                del self._entries[key]
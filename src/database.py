@@ -1,31 +1,144 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Type
+from typing import Any, Callable, Iterable, Iterator, Type
 
 import src
 
+StatementListener = Callable[["Database", Any, "src.StatementProfile"], None]
+
+# Table schemas known to match their model, per database, so repeated create_tables calls skip introspection
+_schema_cache: dict[tuple[Any, ...], dict[str, src.Field]] = {}
+_schema_cache_lock = threading.Lock()
+
+# Pools inherited from a parent process. They are never closed, as that would also end the parent's sessions
+_inherited_pools: list[Any] = []
+
+# Databases created in this process, whose pooled connections a forked child discards
+_databases: weakref.WeakSet[Database] = weakref.WeakSet()
+
+# Statement timeouts in seconds set for the current thread or task, by id of the database whose own timeout they
+# override
+_statement_timeouts: ContextVar[dict[int, float]] = ContextVar("statement_timeouts", default={})
+
+# SQL operators of the lookups a criterion key can end with, like id__gt. Keys without one are matched exactly
+LOOKUPS = {"": "=", "gt": ">"}
+
+# The statement last executed by the thread, so the time spent hydrating its rows can be added to its profile
+_statement_state = threading.local()
+
+
+def _discard_inherited_connections() -> None:
+    """Point the sockets of the pools a forked child inherited at /dev/null, so that freeing the pools, at the latest
+    when the child exits, can't send the server the message that ends the parent's sessions"""
+    devnull = os.open(os.devnull, os.O_RDWR)
+    try:
+        for db in list(_databases):
+            for fd in db._get_pool_sockets():  # pylint: disable=W0212
+                os.dup2(devnull, fd)
+    finally:
+        os.close(devnull)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_discard_inherited_connections)
+
 
 @dataclass
-class DatabaseConfig:
+class DatabaseConfig:  # pylint: disable=R0902
+    """Connection details of a database. A pooled connection idle for longer than ping_interval seconds is pinged
+    before it is used, and one older than max_age seconds is replaced. MySQL's pool pings every connection it hands
+    out, so ping_interval has no effect there. Selects running longer than statement_timeout seconds are cancelled"""
+
     host: str
     user: str
     password: str
     database: str
     minconn: int = 1
     maxconn: int = 1
+    port: int | None = None
+    statement_timeout: float | None = None
+    ping_interval: float = 30.0
+    max_age: float | None = None
+
 
+class Database(ABC):  # pylint: disable=R0902
+    placeholder = "%s"
+    replica_strategies = ("round_robin", "least_busy")
+    prefetch_batch_size = 1000
 
-class Database(ABC):
-    def __init__(self, conn_details: DatabaseConfig) -> None:
+    def __init__(
+        self,
+        conn_details: DatabaseConfig,
+        query_cache: src.QueryCache | None = None,
+        replicas: list[DatabaseConfig] | None = None,
+        replica_strategy: str = "round_robin",
+    ) -> None:
+        if replica_strategy not in self.replica_strategies:
+            raise ValueError(f"Invalid replica strategy provided: {replica_strategy}.")
         self.conn_details = conn_details
-        self.conn = self._init_connection(conn_details)
+        self.query_cache = query_cache
+        self._pool = self._init_connection(conn_details)
+        self._pool_pid = os.getpid()
+        self._pool_lock = threading.Lock()
+        self._connection_times: weakref.WeakKeyDictionary[Any, list[float]] = weakref.WeakKeyDictionary()
+        self.replicas: list[Database] = [type(self)(replica) for replica in replicas or []]
+        self.replica_strategy = replica_strategy
+        self._replica_lock = threading.Lock()
+        self._replica_counter = 0
+        self._replica_busy = [0] * len(self.replicas)
+        self._local = threading.local()
+        self._statement_listeners: list[StatementListener] = []
+        self._mirrors: dict[Type[src.BaseModel], src.Mirror] = {}
+        _databases.add(self)
 
     @abstractmethod
     def _init_connection(self, conn_details: DatabaseConfig) -> Any:
         """Initialize database connection(s)"""
 
+    @property
+    def conn(self) -> Any:
+        """The connection pool. A forked child process creates its own on first use, instead of sharing the
+        parent's sockets, which it discarded when it was forked"""
+        if self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool_pid != os.getpid():
+                    _inherited_pools.append(self._pool)
+                    self._pool = self._init_connection(self.conn_details)
+                    self._connection_times = weakref.WeakKeyDictionary()
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _get_pool_sockets(self) -> list[int]:
+        """Returns the file descriptors of the pooled connections that end their session on the server when freed"""
+        return []
+
+    def _needs_recycle(self, conn: Any) -> bool:
+        """Returns whether a pooled connection is older than max_age. Recycled connections are forgotten, so their
+        replacement's age starts at its next checkout"""
+        now = time.monotonic()
+        times = self._connection_times.setdefault(conn, [now, now])
+        if self.conn_details.max_age is not None and now - times[0] > self.conn_details.max_age:
+            del self._connection_times[conn]
+            return True
+        return False
+
+    def _needs_ping(self, conn: Any) -> bool:
+        """Returns whether a pooled connection was last checked out longer than ping_interval ago, so it may have
+        been dropped by the server in the meantime"""
+        now = time.monotonic()
+        times = self._connection_times.setdefault(conn, [now, now])
+        idle, times[1] = now - times[1], now
+        return idle > self.conn_details.ping_interval
+
     @abstractmethod
     def _execute_query(self, sql_query: Any, query_vars: tuple[Any, ...] | None = None) -> list[tuple[Any, ...]]:
         """Execute SQL on the database and return the resulting rows"""
@@ -36,19 +149,184 @@ class Database(ABC):
     ) -> int:
         """Execute SQL on the database and return either the id of from the last insert or the row count"""
 
+    def _get_sql_text(self, sql_query: Any, cur: Any) -> str:  # pylint: disable=W0613
+        """Returns the SQL of a statement as text, with placeholders for the parameters"""
+        return str(sql_query)
+
+    def _record_statement(  # pylint: disable=R0913
+        self,
+        sql_query: Any,
+        sql_text: str,
+        query_vars: tuple[Any, ...],
+        *,
+        execute_time: float,
+        fetch_time: float,
+        rows: int,
+    ) -> None:
+        """Pass an executed statement on to the listeners, such as an active profiler"""
+        if not self._statement_listeners or getattr(_statement_state, "explaining", False):
+            return
+        statement = src.StatementProfile(sql_text, query_vars, execute_time, fetch_time, rows)
+        _statement_state.last = statement
+        for listener in list(self._statement_listeners):
+            listener(self, sql_query, statement)
+
+    @contextmanager
+    def _listening(self, listener: StatementListener) -> Iterator[None]:
+        """Pass every statement executed through this database, including on its replicas, inside the block to the
+        listener"""
+        nodes = [self, *self.replicas]
+        for node in nodes:
+            node._statement_listeners.append(listener)  # pylint: disable=W0212
+        try:
+            yield
+        finally:
+            for node in nodes:
+                node._statement_listeners.remove(listener)  # pylint: disable=W0212
+
+    @contextmanager
+    def profile(self, explain: bool = False) -> Iterator[src.Profiler]:
+        """Profile every statement executed through this database, including on its replicas, inside the block"""
+        profiler = src.Profiler(explain)
+        with self._listening(profiler):
+            yield profiler
+
+    @contextmanager
+    def detect_n_plus_one(self, threshold: int = 5, action: str = "warn") -> Iterator[src.NPlusOneDetector]:
+        """Warn or raise when a select is repeated with threshold different parameters by one thread in the block"""
+        detector = src.NPlusOneDetector(threshold, action)
+        with self._listening(detector):
+            yield detector
+
+    @contextmanager
+    def statement_timeout(self, seconds: float) -> Iterator[None]:
+        """Cancel selects executed through this database, including on its replicas, by the current thread inside the
+        block that run longer than the given seconds, instead of the database's statement_timeout. Zero lifts the
+        limit"""
+        timeouts = {id(node): seconds for node in [self, *self.replicas]}
+        token = _statement_timeouts.set(_statement_timeouts.get() | timeouts)
+        try:
+            yield
+        finally:
+            _statement_timeouts.reset(token)
+
+    def _get_statement_timeout(self) -> float:
+        """Returns the seconds a statement of the current thread may run for, or zero if there is no limit"""
+        timeout = _statement_timeouts.get().get(id(self))
+        return (self.conn_details.statement_timeout or 0) if timeout is None else timeout
+
+    def _explain(self, sql_query: Any, query_vars: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        _statement_state.explaining = True
+        try:
+            return self._execute_query(self._get_explain_sql(sql_query), query_vars)
+        finally:
+            _statement_state.explaining = False
+
+    @abstractmethod
+    def _get_explain_sql(self, sql_query: Any) -> Any:
+        """Returns the SQL that shows the query plan of a select"""
+
     def create_table(self, model: Type[src.BaseModel]) -> None:
         """Create table from a model. If table exists and is differs from model, the table is altered"""
         table_schema = self._get_table_schema(model)
         if not table_schema:
             create_table_sql = self._get_create_table_sql(model)
             self._execute_update(create_table_sql)
+            self._on_write(model)
+        elif table_schema != model.get_all_field_defs():
+            self._execute_updates(self._get_alter_table_sql(model, table_schema))
+            self._on_write(model)
+        self._set_cached_schema(model)
+
+    def migrate(
+        self,
+        model: Type[src.BaseModel],
+        backfill: dict[str, Any] | None = None,
+        batch_size: int = 1000,
+        throttle: float = 0.0,
+        progress: Callable[[src.BackfillProgress], None] | None = None,
+    ) -> None:
+        """Apply a model's schema changes in short transactions, then backfill added columns in throttled batches"""
+        model.validate_field_types(backfill or {})
+        table_schema = self._get_table_schema(model)
+        if not table_schema:
+            self.create_table(model)
             return
+        if table_schema != model.get_all_field_defs():
+            for sql_queries in self._get_migration_sql(model, table_schema):
+                self._execute_updates(sql_queries)
+            self._on_write(model)
+        self._set_cached_schema(model)
+        for field, value in (backfill or {}).items():
+            src.migration.backfill(
+                self, model, field, value, batch_size=batch_size, throttle=throttle, progress=progress
+            )
 
-        if table_schema == model.get_all_field_defs():
+    def create_tables(self, *models: Type[src.BaseModel], use_cache: bool = True) -> None:
+        """Create or alter the tables of several models, introspecting all of them with one catalog query and
+        applying the DDL in one transaction where the database supports transactional DDL. Models whose schema
+        was already created or checked by this process are skipped, unless use_cache is False"""
+        pending = [model for model in models if not use_cache or not self._is_schema_cached(model)]
+        if not pending:
             return
 
-        alter_table_sql = self._get_alter_table_sql(model, table_schema)
-        self._execute_update(alter_table_sql)
+        schemas = self._get_table_schemas(pending)
+        sql_queries = []
+        for model in self._sort_by_references(pending):
+            table_schema = schemas.get(model.__name__.lower())
+            if not table_schema:
+                sql_queries.append(self._get_create_table_sql(model))
+            elif table_schema != model.get_all_field_defs():
+                sql_queries.extend(self._get_alter_table_sql(model, table_schema))
+        self._execute_updates(sql_queries)
+        for model in pending:
+            self._on_write(model)
+            self._set_cached_schema(model)
+
+    @staticmethod
+    def _sort_by_references(models: list[Type[src.BaseModel]]) -> list[Type[src.BaseModel]]:
+        """Order models so that tables referenced by a foreign key are created before the tables referencing them"""
+        ordered: list[Type[src.BaseModel]] = []
+        visited: set[Type[src.BaseModel]] = set()
+
+        def visit(model: Type[src.BaseModel]) -> None:
+            if model in visited:
+                return
+            visited.add(model)
+            for field in model.get_related_field_defs().values():
+                if field.to in models:
+                    visit(field.to)
+            ordered.append(model)
+
+        for model in models:
+            visit(model)
+        return ordered
+
+    def _get_table_key(self, model: Type[src.BaseModel]) -> tuple[Any, ...]:
+        """Identifies the model's table across databases, in the schema cache or a query cache they share"""
+        conn_details = self.conn_details
+        return type(self).__name__, conn_details.host, conn_details.port, conn_details.database, model.__name__.lower()
+
+    def _is_schema_cached(self, model: Type[src.BaseModel]) -> bool:
+        return _schema_cache.get(self._get_table_key(model)) == model.get_all_field_defs()
+
+    def _set_cached_schema(self, model: Type[src.BaseModel]) -> None:
+        with _schema_cache_lock:
+            _schema_cache[self._get_table_key(model)] = model.get_all_field_defs()
+
+    def _clear_schema_cache(self) -> None:
+        with _schema_cache_lock:
+            database = self._get_table_key(src.BaseModel)[:-1]
+            for key in [key for key in _schema_cache if key[:-1] == database]:
+                del _schema_cache[key]
+
+    @abstractmethod
+    def _execute_updates(self, sql_queries: list[Any]) -> None:
+        """Execute several statements on one connection, in a single transaction if the database allows it"""
+
+    @abstractmethod
+    def _get_table_schemas(self, models: list[Type[src.BaseModel]]) -> dict[str, dict[str, src.Field]]:
+        """Returns the schemas of the models' tables, by table name, from a single catalog query"""
 
     @abstractmethod
     def _get_table_schema(self, model: Type[src.BaseModel]) -> dict[str, src.Field]:
@@ -59,8 +337,17 @@ class Database(ABC):
         """Returns the SQL required to create a new table in the database"""
 
     @abstractmethod
-    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> Any:
-        """Returns the SQL required to alter an existing table in the database"""
+    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[Any]:
+        """Returns the SQL statements required to alter an existing table in the database"""
+
+    @abstractmethod
+    def _get_next_id_sql(self, model: Type[src.BaseModel], next_id: int) -> list[Any]:
+        """Returns the SQL statements making the next row inserted into the table get the given id"""
+
+    def _get_migration_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[list[Any]]:
+        """Returns the SQL statements altering an existing table, grouped into transactions that each lock the table
+        briefly, like one per column"""
+        return [self._get_alter_table_sql(model, schema)]
 
     def save(self, model: src.BaseModel) -> None:
         """Save model data to database. If the model is new, the value is added; otherwise it's updated"""
@@ -71,6 +358,111 @@ class Database(ABC):
             insert_sql, query_vars = self._get_insert_table_sql(model)
             result = self._execute_update(insert_sql, query_vars, insert_id=True)
             model.id = result
+        self._on_write(type(model))
+
+    def load(
+        self,
+        model: Type[src.BaseModel],
+        source: str | os.PathLike[str] | Iterable[tuple[Any, ...] | dict[str, Any]],
+        batch_size: int = 1000,
+    ) -> int:
+        """Bulk insert rows from a CSV file with a header row, or from an iterable of tuples (in field order) or
+        dictionaries, using the fastest insert the database has. Returns the number of rows inserted"""
+        columns, rows = src.loader.read_rows(model, source)
+        if not columns:
+            return 0
+        count = self._bulk_insert(model, columns, src.loader.batched(rows, batch_size))
+        self._on_write(model)
+        return count
+
+    @abstractmethod
+    def _bulk_insert(
+        self, model: Type[src.BaseModel], columns: list[str], batches: Iterator[list[tuple[Any, ...]]]
+    ) -> int:
+        """Insert batches of rows on one connection, in one transaction, and return the number of rows inserted"""
+
+    def _insert_rows(
+        self, model: Type[src.BaseModel], columns: list[str], rows: list[tuple[Any, ...]]  # pylint: disable=W0613
+    ) -> list[int] | None:
+        """Insert rows in one transaction and return their ids in order, or None if the database can't tell them"""
+        return None
+
+    def _on_write(self, model: Type[src.BaseModel]) -> None:
+        """Drop cached results of the model's table after it was written to, and make reads sticky if requested"""
+        if self.query_cache is not None:
+            self.query_cache.invalidate(self._get_table_key(model))
+        if model in self._mirrors:
+            mirror = self._mirrors[model]
+            mirror.invalidate(full=mirror.updated_field is None)
+        if getattr(self._local, "read_your_writes", False):
+            self._local.has_written = True
+
+    @contextmanager
+    def read_your_writes(self) -> Iterator[None]:
+        """Once the current thread writes inside this block, its reads go to the primary instead of a replica"""
+        previous = getattr(self._local, "read_your_writes", False), getattr(self._local, "has_written", False)
+        self._local.read_your_writes = True
+        try:
+            yield
+        finally:
+            self._local.read_your_writes, self._local.has_written = previous
+
+    def _read_rows(self, sql_query: Any, query_vars: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        """Execute a read on a replica if any are configured, otherwise on the primary"""
+        with self._get_read_node() as node:
+            return node._execute_query(sql_query, query_vars)  # pylint: disable=W0212
+
+    @contextmanager
+    def _get_read_node(self) -> Iterator[Database]:
+        if not self.replicas or getattr(self._local, "has_written", False):
+            yield self
+            return
+
+        with self._replica_lock:
+            if self.replica_strategy == "least_busy":
+                idx = min(range(len(self.replicas)), key=self._replica_busy.__getitem__)
+            else:
+                idx = self._replica_counter % len(self.replicas)
+                self._replica_counter += 1
+            self._replica_busy[idx] += 1
+        try:
+            yield self.replicas[idx]
+        finally:
+            with self._replica_lock:
+                self._replica_busy[idx] -= 1
+
+    def iter_rows(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], chunk_size: int = 1000
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        """Stream a model's rows in chunks from a cursor, without building model instances. The values are converted
+        to their Python types, with the id first followed by the model's fields"""
+        select_sql, query_vars = self._get_select_table_sql(model, criterion)
+        convert = self._get_row_converter(model)
+        with self._get_read_node() as node:
+            for rows in node._iter_query(select_sql, query_vars, chunk_size):  # pylint: disable=W0212
+                yield [convert(row) for row in rows] if convert else rows
+
+    def _get_row_converter(self, model: Type[src.BaseModel]) -> Callable[[tuple[Any, ...]], tuple[Any, ...]] | None:
+        """Returns the function reordering a selected row to the id followed by the model's fields, with the values
+        converted to their Python types, or None if the rows already are"""
+        _fields = model.get_all_field_defs()
+        select_fields = self._get_select_fields(model)
+        plan = [
+            (select_fields.index(f), self._get_value_converter(_fields[f])) for f in ["id", *model.get_field_names()]
+        ]
+        if all(idx == pos and not conv for pos, (idx, conv) in enumerate(plan)):
+            return None
+        return lambda row: tuple(conv(row[idx]) if conv else row[idx] for idx, conv in plan)
+
+    @abstractmethod
+    def _iter_query(
+        self, sql_query: Any, query_vars: tuple[Any, ...], chunk_size: int
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        """Execute SQL on the database and yield the resulting rows in chunks, holding one connection throughout"""
+
+    def _get_value_converter(self, field: src.Field) -> Callable[[Any], Any] | None:  # pylint: disable=W0613
+        """Returns the function converting a value read from the database to the field's Python type, if needed"""
+        return None
 
     @abstractmethod
     def _get_update_table_sql(self, model: src.BaseModel) -> tuple[Any, tuple[Any, ...]]:
@@ -80,13 +472,177 @@ class Database(ABC):
     def _get_insert_table_sql(self, model: src.BaseModel) -> tuple[Any, tuple[Any, ...]]:
         """Returns the SQL required to insert a model's data into a table in the database"""
 
+    def mirror(
+        self,
+        model: Type[src.BaseModel],
+        refresh_interval: float = 60.0,
+        updated_field: str | None = None,
+        full_reload_interval: float = 600.0,
+    ) -> src.Mirror:
+        """Copy a small, rarely changing table into an in-memory SQLite database that answers its queries. The copy
+        is refreshed on the first read after refresh_interval seconds, or after a write through this database"""
+        mirror = src.Mirror(self, model, refresh_interval, updated_field, full_reload_interval)
+        self._mirrors[model] = mirror
+        return mirror
+
     def query(self, model: Type[src.T]) -> src.Query[src.T]:
         query = src.Query(model, self)
         return query
 
+    def gather(self, *queries: src.Query[Any], return_exceptions: bool = False) -> list[Any]:
+        """Evaluate queries concurrently on a thread pool sized to the read connection pool. Results keep the query
+        order; a failed query's error is raised once all are done, or returned in its place with return_exceptions"""
+        if not queries:
+            return []
+        nodes = self.replicas or [self]
+        pool_size = sum(node.conn_details.maxconn for node in nodes)
+        with ThreadPoolExecutor(max_workers=min(len(queries), pool_size), thread_name_prefix="gather") as executor:
+            futures = [executor.submit(query.all) for query in queries]
+            wait(futures)
+        errors = [future.exception() for future in futures]
+        if not return_exceptions:
+            for error in errors:
+                if error is not None:
+                    raise error
+        return [error if error is not None else future.result() for future, error in zip(futures, errors)]
+
+    def fetch_results(  # pylint: disable=R0914
+        self,
+        model: Type[src.T],
+        criterion: dict[str, Any],
+        limit: int = 0,
+        select_related: tuple[str, ...] = (),
+        cached: bool = True,
+    ) -> list[src.T]:
+        """Retrieve data from database. Can be filtered and limited. Served from the model's mirror or the query cache
+        when enabled, unless cached is False"""
+        mirror = self._mirrors.get(model) if cached else None
+        # Joined tables aren't mirrored, and a stale mirror that another thread is refreshing isn't used
+        if mirror is not None and not select_related and mirror.try_refresh():
+            return mirror.db.fetch_results(model, criterion, limit)
+        if select_related:
+            select_sql, query_vars = self._get_select_related_sql(model, criterion, limit, select_related)
+        else:
+            select_sql, query_vars = self._get_select_table_sql(model, criterion, limit)
+        _statement_state.last = None
+        # Joined rows depend on several tables, while the cache is only invalidated per table
+        if self.query_cache is None or select_related or not cached:
+            rows = self._read_rows(select_sql, query_vars)
+        else:
+            table = self._get_table_key(model)
+            key = self.query_cache.make_key(table, list(model.get_all_field_defs()), criterion, limit)
+            cached_rows = self.query_cache.get(key) if key else None
+            if cached_rows is None:
+                generation = self.query_cache.generation(table)
+                rows = self._read_rows(select_sql, query_vars)
+                if key:
+                    self.query_cache.set(key, rows, generation)
+            else:
+                rows = cached_rows
+
+        start = time.perf_counter()
+        if select_related:
+            results = self._get_models_from_joined_rows(model, rows, select_related)
+        else:
+            results = self._get_models_from_rows(model, rows)
+        statement: src.StatementProfile | None = getattr(_statement_state, "last", None)
+        if statement is not None:
+            statement.hydration_time += time.perf_counter() - start
+            _statement_state.last = None
+        return results
+
+    def prefetch_related(self, model: Type[src.T], results: list[src.T], fields: tuple[str, ...]) -> None:
+        """Load the models referenced by foreign keys of the results, with one batched select per field"""
+        related_defs = model.get_related_field_defs()
+        for field in fields:
+            ids = sorted({getattr(result, field) for result in results} - {None})
+            related = {obj.id: obj for obj in self._fetch_by_ids(related_defs[field].to, ids)}
+            for result in results:
+                result._related[field] = related.get(getattr(result, field))  # pylint: disable=W0212
+
+    def _fetch_by_ids(self, model: Type[src.T], ids: list[int]) -> list[src.T]:
+        results: list[src.T] = []
+        fields = ", ".join(self._get_select_fields(model))
+        for start in range(0, len(ids), self.prefetch_batch_size):
+            batch = tuple(ids[start : start + self.prefetch_batch_size])
+            placeholders = ", ".join([self.placeholder] * len(batch))
+            sql = f"SELECT {fields} FROM {model.__name__.lower()} WHERE id IN ({placeholders}) ORDER BY id;"
+            results.extend(self._get_models_from_rows(model, self._read_rows(sql, batch)))
+        return results
+
+    def _get_select_fields(self, model: Type[src.BaseModel]) -> list[str]:
+        """Returns the columns selected for a model, in the order _get_models_from_rows expects them"""
+        return list(model.get_all_field_defs())
+
+    def _to_db_value(self, field: src.Field, value: Any) -> Any:  # pylint: disable=W0613
+        """Convert a filter value to the value the database compares against"""
+        return value
+
+    @staticmethod
+    def _get_lookup(key: str) -> tuple[str, str]:
+        """Returns the field of a criterion key and the SQL operator of its lookup"""
+        field, _, lookup = key.partition("__")
+        return field, LOOKUPS[lookup]
+
+    def _get_conditions(self, criterion: dict[str, Any], prefix: str = "") -> list[str]:
+        """Returns the SQL condition of every criterion, comparing the field to a placeholder"""
+        return [
+            f"{prefix}{field} {operator} {self.placeholder}" for field, operator in map(self._get_lookup, criterion)
+        ]
+
+    def _get_select_related_sql(  # pylint: disable=R0914
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], limit: int, select_related: tuple[str, ...]
+    ) -> tuple[Any, tuple[Any, ...]]:
+        tbl_name = model.__name__.lower()
+        columns = [f"{tbl_name}.{f}" for f in self._get_select_fields(model)]
+        joins = []
+        related_defs = model.get_related_field_defs()
+        for field in select_related:
+            # Aliased per field, since two foreign keys can reference the same table
+            alias = f"{tbl_name}_{field}"
+            columns.extend(f"{alias}.{f}" for f in self._get_select_fields(related_defs[field].to))
+            joins.append(
+                f" LEFT JOIN {related_defs[field].get_table_name()} {alias} ON {alias}.id = {tbl_name}.{field}"
+            )
+        _fields = model.get_all_field_defs()
+        where_clause = " AND ".join(self._get_conditions(criterion, f"{tbl_name}."))
+        where_clause = f" WHERE {where_clause}" if criterion else ""
+        field_values = tuple(self._to_db_value(_fields[self._get_lookup(k)[0]], v) for k, v in criterion.items())
+        limit_clause = f"LIMIT {limit}" if limit else ""
+        sel_fields = ", ".join(columns)
+        sql = (
+            f"SELECT {sel_fields} FROM {tbl_name}{''.join(joins)}{where_clause} ORDER BY {tbl_name}.id {limit_clause};"
+        )
+        return sql, field_values
+
+    def _get_models_from_joined_rows(  # pylint: disable=R0914
+        self, model: Type[src.T], rows: list[tuple[Any, ...]], select_related: tuple[str, ...]
+    ) -> list[src.T]:
+        width = len(self._get_select_fields(model))
+        results = self._get_models_from_rows(model, [row[:width] for row in rows])
+        related_defs = model.get_related_field_defs()
+        offset = width
+        for field in select_related:
+            related_model = related_defs[field].to
+            related_fields = self._get_select_fields(related_model)
+            id_idx = offset + related_fields.index("id")
+            # A null id means the foreign key is null, so there is no related row
+            related_rows = [row[offset : offset + len(related_fields)] for row in rows if row[id_idx] is not None]
+            related = iter(self._get_models_from_rows(related_model, related_rows))
+            for result, row in zip(results, rows):
+                result._related[field] = next(related) if row[id_idx] is not None else None  # pylint: disable=W0212
+            offset += len(related_fields)
+        return results
+
+    @abstractmethod
+    def _get_select_table_sql(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], limit: int = 0
+    ) -> tuple[Any, tuple[Any, ...]]:
+        """Returns the SQL required to select a model's rows from a table in the database"""
+
     @abstractmethod
-    def fetch_results(self, model: Type[src.T], criterion: dict[str, Any], limit: int = 0) -> list[src.T]:
-        """Retrieve data from database. Can be filtered and limited"""
+    def _get_models_from_rows(self, model: Type[src.T], rows: list[tuple[Any, ...]]) -> list[src.T]:
+        """Returns model instances built from the rows returned by the select SQL"""
 
     @abstractmethod
     def _drop_tables(self, **kwargs: Any) -> None:
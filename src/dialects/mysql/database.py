@@ -1,46 +1,94 @@
 from __future__ import annotations
 
+import itertools
+import re
 import time
 from collections import ChainMap
-from typing import Any, Callable, Type
+from datetime import datetime
+from typing import Any, Callable, Iterator, Type
 
+from mysql.connector import errorcode
 from mysql.connector.cursor import MySQLCursor
-from mysql.connector.errors import PoolError
-from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
+from mysql.connector.errors import DatabaseError, PoolError
+from mysql.connector.pooling import CNX_POOL_MAXNAMESIZE, MySQLConnectionPool, PooledMySQLConnection
 
 import src
 
+# Pool names have to be unique per pool, so every database gets its own sequence number
+_pool_ids = itertools.count(1)
+
 
 class MySQLDatabase(src.Database):
     def _init_connection(self, conn_details: src.DatabaseConfig) -> MySQLConnectionPool:
         return MySQLConnectionPool(
-            pool_name="mypool",
+            pool_name=self._get_pool_name(conn_details, next(_pool_ids)),
             pool_size=conn_details.maxconn,
             host=conn_details.host,
-            user="root",
+            port=conn_details.port or 3306,
+            user=conn_details.user,
             password=conn_details.password,
             database=conn_details.database,
         )
 
+    @staticmethod
+    def _get_pool_name(conn_details: src.DatabaseConfig, pool_id: int) -> str:
+        """Names the pool after its DSN, restricted to the characters and length the connector allows"""
+        suffix = f"#{pool_id}"
+        name = f"{conn_details.user}.{conn_details.host}:{conn_details.port or 3306}.{conn_details.database}"
+        name = re.sub(r"[^a-zA-Z0-9._:\-*$]", "_", name)
+        return name[: CNX_POOL_MAXNAMESIZE - len(suffix)] + suffix
+
     def _get_connection(self) -> PooledMySQLConnection:
         for _retry in range(10):
             try:
                 conn_pool: PooledMySQLConnection = self.conn.get_connection()
-                return conn_pool
             except PoolError:
                 time.sleep(0.1)
+                continue
+            # The pool already pings a connection on checkout, and reconnects it if the server dropped it
+            cnx = conn_pool._cnx  # pylint: disable=W0212
+            if self._needs_recycle(cnx):
+                cnx.reconnect()
+            return conn_pool
         raise src.NoConnectionError(PoolError)
 
     def _execute_query(self, sql_query: Any, query_vars: tuple[Any, ...] | None = None) -> list[tuple[Any, ...]]:
         query_vars = query_vars or ()
+        timeout = self._get_statement_timeout()
         with self._get_connection() as conn:
             cur: MySQLCursor = conn.cursor()
-            cur.execute(sql_query, query_vars)
-            print(cur.statement)
-            results: list[tuple[Any, ...]] = cur.fetchall()
+            try:
+                start = time.perf_counter()
+                cur.execute(self._add_timeout_hint(sql_query, timeout), query_vars)
+                executed = time.perf_counter()
+                print(cur.statement)
+                results: list[tuple[Any, ...]] = cur.fetchall()
+                fetched = time.perf_counter()
+            except DatabaseError as err:
+                if err.errno == errorcode.ER_QUERY_TIMEOUT:
+                    raise src.QueryTimeoutError(timeout) from err
+                raise
+            finally:
+                cur.close()
             conn.commit()
-            cur.close()
-            return results
+        self._record_statement(
+            sql_query,
+            str(sql_query),
+            query_vars,
+            execute_time=executed - start,
+            fetch_time=fetched - executed,
+            rows=len(results),
+        )
+        return results
+
+    @staticmethod
+    def _add_timeout_hint(sql_query: str, timeout: float) -> str:
+        """Limit a select with an optimizer hint, which unlike a session variable leaves the pooled connection as
+        it was. MySQL only enforces MAX_EXECUTION_TIME on selects"""
+        if not timeout or not sql_query.lstrip().upper().startswith("SELECT"):
+            return sql_query
+        sql_query = sql_query.lstrip()
+        return f"{sql_query[:6]} /*+ MAX_EXECUTION_TIME({max(1, round(timeout * 1000))}) */{sql_query[6:]}"
 
     def _execute_update(
         self, sql_query: Any, query_vars: tuple[Any, ...] | None = None, insert_id: bool = False
@@ -48,12 +96,109 @@ class MySQLDatabase(src.Database):
         query_vars = query_vars or ()
         with self._get_connection() as conn:
             cur: MySQLCursor = conn.cursor()
+            start = time.perf_counter()
             cur.execute(sql_query, query_vars)
+            executed = time.perf_counter()
             print(cur.statement)
             result: int = cur._last_insert_id if insert_id else cur.rowcount  # type: ignore # pylint: disable=W0212
+            rowcount = cur.rowcount
             conn.commit()
             cur.close()
-            return result
+        self._record_statement(
+            sql_query, str(sql_query), query_vars, execute_time=executed - start, fetch_time=0.0, rows=rowcount
+        )
+        return result
+
+    def _execute_updates(self, sql_queries: list[Any]) -> None:
+        # MySQL commits implicitly after DDL, so the statements only share a connection, not a transaction
+        timings = []
+        with self._get_connection() as conn:
+            cur: MySQLCursor = conn.cursor()
+            for sql_query in sql_queries:
+                start = time.perf_counter()
+                cur.execute(sql_query)
+                timings.append((sql_query, time.perf_counter() - start, cur.rowcount))
+            conn.commit()
+            cur.close()
+        for sql_query, execute_time, rowcount in timings:
+            self._record_statement(
+                sql_query, str(sql_query), (), execute_time=execute_time, fetch_time=0.0, rows=rowcount
+            )
+
+    def _bulk_insert(
+        self, model: Type[src.BaseModel], columns: list[str], batches: Iterator[list[tuple[Any, ...]]]
+    ) -> int:
+        timings = []
+        count = 0
+        with self._get_connection() as conn:
+            cur: MySQLCursor = conn.cursor()
+            try:
+                for batch in batches:
+                    sql, values = self._get_bulk_insert_sql(model, columns, batch)
+                    start = time.perf_counter()
+                    cur.execute(sql, values)
+                    timings.append((sql, time.perf_counter() - start, cur.rowcount))
+                    count += len(batch)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        for sql, execute_time, rowcount in timings:
+            self._record_statement(sql, sql, (), execute_time=execute_time, fetch_time=0.0, rows=rowcount)
+        return count
+
+    def _insert_rows(
+        self, model: Type[src.BaseModel], columns: list[str], rows: list[tuple[Any, ...]]
+    ) -> list[int] | None:
+        sql, values = self._get_bulk_insert_sql(model, columns, rows)
+        with self._get_connection() as conn:
+            cur: MySQLCursor = conn.cursor()
+            try:
+                start = time.perf_counter()
+                cur.execute(sql, values)
+                executed = time.perf_counter()
+                # A multi-row insert reports the id of its first row, and gives the rows consecutive ids
+                first_id: int = cur.lastrowid  # type: ignore
+                rowcount = cur.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        self._record_statement(sql, sql, values, execute_time=executed - start, fetch_time=0.0, rows=rowcount)
+        return list(range(first_id, first_id + len(rows)))
+
+    def _get_bulk_insert_sql(
+        self, model: Type[src.BaseModel], columns: list[str], rows: list[tuple[Any, ...]]
+    ) -> tuple[str, tuple[Any, ...]]:
+        """Returns one multi-row insert for the rows, instead of a round trip per row"""
+        _flds = model.get_all_field_defs()
+        fields = [_flds[column] for column in columns]
+        row_placeholders = f"({', '.join(['%s'] * len(columns))})"
+        sql = f"INSERT INTO {model.__name__.lower()} ({', '.join(columns)}) VALUES "
+        sql += ", ".join([row_placeholders] * len(rows)) + ";"
+        return sql, tuple(self._to_db_value(f, v) for row in rows for f, v in zip(fields, row))
+
+    def _iter_query(
+        self, sql_query: Any, query_vars: tuple[Any, ...], chunk_size: int
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        # The default cursor is unbuffered, so rows are read from the server as they are fetched
+        with self._get_connection() as conn:
+            cur: MySQLCursor = conn.cursor()
+            try:
+                cur.execute(sql_query, query_vars)
+                while rows := cur.fetchmany(chunk_size):
+                    yield rows
+            finally:
+                if conn.unread_result:
+                    conn.consume_results()
+                cur.close()
+
+    def _get_explain_sql(self, sql_query: Any) -> Any:
+        return f"EXPLAIN {sql_query}"
 
     def _get_table_schema(self, model: Type[src.BaseModel]) -> dict[str, src.Field]:
         describe_table_sql_template = (
@@ -63,32 +208,63 @@ class MySQLDatabase(src.Database):
         results = self._execute_query(describe_table_sql_template, (model.__name__.lower(),))
         return dict(ChainMap(*[self._create_field(*col) for col in results]))
 
+    def _get_table_schemas(self, models: list[Type[src.BaseModel]]) -> dict[str, dict[str, src.Field]]:
+        describe_tables_sql_template = (
+            "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH FROM INFORMATION_SCHEMA.COLUMNS "
+            f"WHERE table_name IN ({', '.join(['%s'] * len(models))})"
+        )
+        results = self._execute_query(describe_tables_sql_template, tuple(model.__name__.lower() for model in models))
+        schemas: dict[str, dict[str, src.Field]] = {}
+        for table_name, *col in results:
+            schemas.setdefault(table_name, {}).update(self._create_field(*col))
+        return schemas
+
     @classmethod
     def _create_field(cls, name: str, f_type: str, max_length: int) -> dict[str, src.Field]:
         field_mapping: dict[str, Callable[..., Any]] = {
             "int": src.IntField,
             "tinyint": src.BoolField,
             "varchar": src.CharField,
+            "double": src.FloatField,
+            "datetime": src.DateTimeField,
+            "longblob": src.BytesField,
         }
         field_func = field_mapping[f_type]
-        return {name: field_func(max_length) if max_length else field_func()}
+        # Blobs report their maximum size in bytes, which isn't a length of the field
+        return {name: field_func(max_length) if max_length and field_func is src.CharField else field_func()}
 
     def _get_create_table_sql(self, model: Type[src.BaseModel]) -> Any:
         _fields = model.get_configured_field_defs()
         sql_fields = [f"{k} {self.get_sql_type(v)}{self.get_field_max_len(v)}" for k, v in _fields.items()]
+        # MySQL ignores REFERENCES in a column definition, so foreign keys are declared as table constraints
+        sql_fields.extend(self._get_foreign_key_sql(k, v) for k, v in model.get_related_field_defs().items())
         return f"CREATE TABLE {model.__name__.lower()} (id INT AUTO_INCREMENT PRIMARY KEY, {', '.join(sql_fields)});"
 
-    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> Any:
-        orgnl_fields = schema
+    def _get_next_id_sql(self, model: Type[src.BaseModel], next_id: int) -> list[Any]:
+        return [f"ALTER TABLE {model.__name__.lower()} AUTO_INCREMENT = {next_id};"]
+
+    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[Any]:
+        return [f"ALTER TABLE {model.__name__.lower()} {', '.join(self._get_alter_actions(model, schema))}"]
+
+    def _get_migration_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[list[Any]]:
+        return [[f"ALTER TABLE {model.__name__.lower()} {action}"] for action in self._get_alter_actions(model, schema)]
+
+    def _get_alter_actions(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[str]:
+        """Returns the changes to the table's columns: added, then retyped, then dropped columns"""
+        orgnl_fields = dict(schema)
         orgnl_fields.pop("id")
         new_fields = model.get_configured_field_defs()
         new_set, orgnl_set = set(new_fields.keys()), set(orgnl_fields.keys())
-        actions = [f"DROP COLUMN {name}" for name in orgnl_set.difference(new_set)]
         to_add = [(key, new_fields[key]) for key in new_set.difference(orgnl_set)]
-        actions.extend([f"ADD COLUMN {k} {self.get_sql_type(v)}{self.get_field_max_len(v)}" for k, v in to_add])
+        actions = [f"ADD COLUMN {k} {self.get_sql_type(v)}{self.get_field_max_len(v)}" for k, v in to_add]
+        actions.extend([f"ADD {self._get_foreign_key_sql(k, v)}" for k, v in to_add if isinstance(v, src.RelatedField)])
         to_upd = [(k, new_fields[k]) for k in new_set.intersection(orgnl_set) if new_fields[k] != orgnl_fields[k]]
         actions.extend([f"MODIFY COLUMN {k} {self.get_sql_type(v)}{self.get_field_max_len(v)}" for k, v in to_upd])
-        return f"ALTER TABLE {model.__name__.lower()} {', '.join(actions)}"
+        actions.extend([f"DROP COLUMN {name}" for name in orgnl_set.difference(new_set)])
+        return actions
+
+    def _get_foreign_key_sql(self, name: str, field: src.RelatedField) -> str:
+        return f"FOREIGN KEY ({name}) REFERENCES {field.get_table_name()}(id)"
 
     def _get_insert_table_sql(self, model: src.BaseModel) -> tuple[Any, tuple[Any, ...]]:
         tbl_name = model.__class__.__name__.lower()
@@ -107,15 +283,19 @@ class MySQLDatabase(src.Database):
         field_values.append(model.id)
         return f"UPDATE {tbl_name} SET {assignments} WHERE id = %s;", tuple(field_values)
 
-    def fetch_results(self, model: Type[src.T], criterion: dict[str, Any], limit: int = 0) -> list[src.T]:
+    def _get_select_table_sql(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], limit: int = 0
+    ) -> tuple[Any, tuple[Any, ...]]:
         _flds = model.get_all_field_defs()
-        where_clause = " WHERE " + " AND ".join([f"{f} = %s" for f in criterion.keys()]) if criterion else ""
-        field_values = [int(v) if _flds[k] == src.BoolField() else v for k, v in criterion.items()] if criterion else []
+        where_clause = " WHERE " + " AND ".join(self._get_conditions(criterion)) if criterion else ""
+        field_values = [self._to_db_value(_flds[self._get_lookup(k)[0]], v) for k, v in criterion.items()]
         limit_clause = f"LIMIT {limit}" if limit else ""
         sel_fields = ", ".join(_flds.keys())
         tbl_name = model.__name__.lower()
-        sql = f"SELECT {sel_fields} FROM {tbl_name}{where_clause} ORDER BY id {limit_clause};"
-        ret = self._execute_query(sql, tuple(field_values))
+        return f"SELECT {sel_fields} FROM {tbl_name}{where_clause} ORDER BY id {limit_clause};", tuple(field_values)
+
+    def _get_models_from_rows(self, model: Type[src.T], rows: list[tuple[Any, ...]]) -> list[src.T]:
+        _flds = model.get_all_field_defs()
         return [
             model(
                 **{
@@ -123,24 +303,48 @@ class MySQLDatabase(src.Database):
                     for idx, (k, val) in enumerate(_flds.items())
                 }
             )
-            for row in ret
+            for row in rows
         ]
 
+    def _to_db_value(self, field: src.Field, value: Any) -> Any:
+        return int(value) if field == src.BoolField() and value is not None else value
+
+    def _get_value_converter(self, field: src.Field) -> Callable[[Any], Any] | None:
+        if field == src.BoolField():
+            return lambda value: None if value is None else bool(value)
+        return None
+
     def get_field_max_len(self, field: src.Field) -> str:
         if field.native_type == str:
             return f"({field.max_length})" if field.max_length else "(4096)"
         return f"({field.max_length})" if field.max_length else ""
 
     def get_sql_type(self, field: src.Field) -> str:
-        _types = {str: "varchar", int: "int", bool: "tinyint"}
+        _types = {
+            str: "varchar",
+            int: "int",
+            bool: "tinyint",
+            float: "double",
+            datetime: "datetime(6)",
+            bytes: "longblob",
+        }
         return _types[field.native_type]
 
     def _drop_tables(self, **kwargs: Any) -> None:
+        self._clear_schema_cache()
         sql = (
             "SELECT CONCAT('DROP TABLE IF EXISTS ', table_name, ';')"
             f"FROM information_schema.tables WHERE table_schema = '{kwargs['database']}';"
         )
-        drop_tables_sql = self._execute_query(sql)
-        _ = [self._execute_update(sql[0]) for sql in drop_tables_sql]
+        drop_tables_sql = [sql[0] for sql in self._execute_query(sql)]
+        # Tables referenced by a foreign key can only be dropped after the tables referencing them
+        for _retry in range(len(drop_tables_sql)):
+            failed = []
+            for drop_table_sql in drop_tables_sql:
+                try:
+                    self._execute_update(drop_table_sql)
+                except DatabaseError:
+                    failed.append(drop_table_sql)
+            drop_tables_sql = failed
         sql = f"SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = '{kwargs['database']}';"
         assert self._execute_query(sql) == [(0,)]
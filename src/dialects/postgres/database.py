@@ -1,40 +1,106 @@
 from __future__ import annotations
 
+import io
 import time
+import uuid
 from collections import ChainMap
-from typing import Any, Callable, Type
+from datetime import datetime
+from typing import Any, Callable, Iterator, Type
 
+import psycopg2
 from psycopg2._psycopg import connection, cursor
+from psycopg2.errors import QueryCanceled
 from psycopg2.pool import PoolError, ThreadedConnectionPool
-from psycopg2.sql import SQL
+from psycopg2.sql import SQL, Composable
 
 import src
 
 
 class PostgresDatabase(src.Database):
     def _init_connection(self, conn_details: src.DatabaseConfig) -> ThreadedConnectionPool:
-        return ThreadedConnectionPool(**conn_details.__dict__)
+        return ThreadedConnectionPool(
+            conn_details.minconn,
+            conn_details.maxconn,
+            host=conn_details.host,
+            port=conn_details.port,
+            user=conn_details.user,
+            password=conn_details.password,
+            database=conn_details.database,
+        )
+
+    def _get_pool_sockets(self) -> list[int]:
+        # Freeing a connection sends the server a terminate message, even from a forked child
+        conns = [*self._pool._pool, *self._pool._used.values()]  # pylint: disable=W0212
+        return sorted({conn.fileno() for conn in conns if not conn.closed})
 
     def _get_connection(self) -> connection:
         for _retry in range(10):
             try:
                 conn: connection = self.conn.getconn()
-                conn.autocommit = True
-                return conn
             except PoolError:
                 time.sleep(0.1)
+                continue
+            if conn.closed or self._needs_recycle(conn) or (self._needs_ping(conn) and not self._ping(conn)):
+                # The pool opens a new connection in place of a closed one on the next checkout
+                self.conn.putconn(conn, close=True)
+                continue
+            conn.autocommit = True
+            return conn
         raise src.NoConnectionError(PoolError())
 
+    def _put_connection(self, conn: connection) -> None:
+        """Return a connection to the pool outside of any transaction. One that can't be rolled back is closed, so
+        the pool replaces it instead of losing its slot"""
+        try:
+            if not conn.closed and not conn.autocommit:
+                conn.rollback()
+                conn.autocommit = True
+        except psycopg2.Error:
+            self.conn.putconn(conn, close=True)
+        else:
+            self.conn.putconn(conn)
+
+    @staticmethod
+    def _ping(conn: connection) -> bool:
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            return True
+        except psycopg2.Error:
+            return False
+
     def _execute_query(self, sql_query: Any, query_vars: tuple[Any, ...] | None = None) -> list[tuple[Any, ...]]:
         query_vars = query_vars or ()
+        timeout = self._get_statement_timeout()
         conn = self._get_connection()
         try:
+            # The timeout is set for the select's transaction only, so it never limits writes on the connection
+            conn.autocommit = not timeout
             cur: cursor = conn.cursor()
+            if timeout:
+                cur.execute("SET LOCAL statement_timeout = %s", (round(timeout * 1000),))
+            start = time.perf_counter()
             cur.execute(sql_query, query_vars)
+            executed = time.perf_counter()
             results: list[tuple[Any, ...]] = cur.fetchall()
-            return results
+            fetched = time.perf_counter()
+            sql_text = self._get_sql_text(sql_query, cur) if self._statement_listeners else ""
+            if timeout:
+                conn.commit()
+        except QueryCanceled as err:
+            raise src.QueryTimeoutError(timeout) from err
         finally:
-            self.conn.putconn(conn)
+            self._put_connection(conn)
+        self._record_statement(
+            sql_query,
+            sql_text,
+            query_vars,
+            execute_time=executed - start,
+            fetch_time=fetched - executed,
+            rows=len(results),
+        )
+        return results
 
     def _execute_update(
         self, sql_query: Any, query_vars: tuple[Any, ...] | None = None, insert_id: bool = False
@@ -43,11 +109,126 @@ class PostgresDatabase(src.Database):
         conn = self._get_connection()
         try:
             cur: cursor = conn.cursor()
+            start = time.perf_counter()
             cur.execute(sql_query, query_vars)
+            executed = time.perf_counter()
             result: int = cur.fetchone()[0] if insert_id else cur.rowcount  # type: ignore
-            return result
+            sql_text = self._get_sql_text(sql_query, cur) if self._statement_listeners else ""
+        finally:
+            self.conn.putconn(conn)
+        self._record_statement(
+            sql_query, sql_text, query_vars, execute_time=executed - start, fetch_time=0.0, rows=cur.rowcount
+        )
+        return result
+
+    def _execute_updates(self, sql_queries: list[Any]) -> None:
+        timings = []
+        conn = self._get_connection()
+        try:
+            conn.autocommit = False
+            cur: cursor = conn.cursor()
+            for sql_query in sql_queries:
+                start = time.perf_counter()
+                cur.execute(sql_query)
+                sql_text = self._get_sql_text(sql_query, cur) if self._statement_listeners else ""
+                timings.append((sql_query, sql_text, time.perf_counter() - start, cur.rowcount))
+            conn.commit()
+        finally:
+            self._put_connection(conn)
+        for sql_query, sql_text, execute_time, rowcount in timings:
+            self._record_statement(sql_query, sql_text, (), execute_time=execute_time, fetch_time=0.0, rows=rowcount)
+
+    def _bulk_insert(
+        self, model: Type[src.BaseModel], columns: list[str], batches: Iterator[list[tuple[Any, ...]]]
+    ) -> int:
+        copy_sql = f"COPY {model.__name__.lower()} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        timings = []
+        count = 0
+        conn = self._get_connection()
+        try:
+            conn.autocommit = False
+            cur: cursor = conn.cursor()
+            for batch in batches:
+                buffer = io.StringIO()
+                buffer.writelines(",".join(self._get_copy_value(value) for value in row) + "\n" for row in batch)
+                buffer.seek(0)
+                start = time.perf_counter()
+                cur.copy_expert(copy_sql, buffer)
+                timings.append((time.perf_counter() - start, len(batch)))
+                count += len(batch)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         finally:
+            conn.autocommit = True
             self.conn.putconn(conn)
+        for execute_time, rowcount in timings:
+            self._record_statement(copy_sql, copy_sql, (), execute_time=execute_time, fetch_time=0.0, rows=rowcount)
+        return count
+
+    def _insert_rows(
+        self, model: Type[src.BaseModel], columns: list[str], rows: list[tuple[Any, ...]]
+    ) -> list[int] | None:
+        # COPY can't return the ids, unlike a multi-row insert, which returns them in the order of its rows
+        row_placeholders = SQL(f"({', '.join(['%s'] * len(columns))})")
+        insert_sql = SQL("INSERT INTO {} ({}) VALUES {} RETURNING id;").format(
+            SQL(model.__name__.lower()), SQL(", ".join(columns)), SQL(", ").join([row_placeholders] * len(rows))
+        )
+        query_vars = tuple(value for row in rows for value in row)
+        conn = self._get_connection()
+        try:
+            cur: cursor = conn.cursor()
+            start = time.perf_counter()
+            cur.execute(insert_sql, query_vars)
+            executed = time.perf_counter()
+            ids = [row[0] for row in cur.fetchall()]
+            sql_text = self._get_sql_text(insert_sql, cur) if self._statement_listeners else ""
+        finally:
+            self.conn.putconn(conn)
+        self._record_statement(
+            insert_sql, sql_text, query_vars, execute_time=executed - start, fetch_time=0.0, rows=len(ids)
+        )
+        return ids
+
+    @staticmethod
+    def _get_copy_value(value: Any) -> str:
+        """Format a value for COPY in CSV format, where only an unquoted empty value is null"""
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, str):
+            return '"' + value.replace('"', '""') + '"'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, src.models.fields.BYTES_TYPES):
+            return "\\x" + bytes(value).hex()
+        return str(value)
+
+    def _iter_query(
+        self, sql_query: Any, query_vars: tuple[Any, ...], chunk_size: int
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        conn = self._get_connection()
+        try:
+            # A named cursor keeps the result on the server, which only works inside a transaction
+            conn.autocommit = False
+            cur: cursor = conn.cursor(name=f"iter_{uuid.uuid4().hex}")
+            cur.itersize = chunk_size
+            cur.execute(sql_query, query_vars)
+            while rows := cur.fetchmany(chunk_size):
+                yield rows
+            cur.close()
+        finally:
+            conn.rollback()
+            conn.autocommit = True
+            self.conn.putconn(conn)
+
+    def _get_sql_text(self, sql_query: Any, cur: Any) -> str:
+        return sql_query.as_string(cur) if isinstance(sql_query, Composable) else str(sql_query)
+
+    def _get_explain_sql(self, sql_query: Any) -> Any:
+        return SQL("EXPLAIN ") + sql_query if isinstance(sql_query, Composable) else f"EXPLAIN {sql_query}"
 
     def _get_table_schema(self, model: Type[src.BaseModel]) -> dict[str, src.Field]:
         describe_table_sql_template = (
@@ -57,26 +238,51 @@ class PostgresDatabase(src.Database):
         results = self._execute_query(describe_table_sql_template, (model.__name__.lower(),))
         return dict(ChainMap(*[self._create_field(*col) for col in results]))
 
+    def _get_table_schemas(self, models: list[Type[src.BaseModel]]) -> dict[str, dict[str, src.Field]]:
+        describe_tables_sql_template = (
+            "SELECT table_name, column_name, data_type, character_maximum_length "
+            "FROM information_schema.columns WHERE table_name = ANY(%s);"
+        )
+        results = self._execute_query(describe_tables_sql_template, ([model.__name__.lower() for model in models],))
+        schemas: dict[str, dict[str, src.Field]] = {}
+        for table_name, *col in results:
+            schemas.setdefault(table_name, {}).update(self._create_field(*col))
+        return schemas
+
     def _get_create_table_sql(self, model: Type[src.BaseModel]) -> Any:
         create_table_sql_template = "CREATE TABLE {} (id SERIAL PRIMARY KEY, {});"
         _fields = model.get_configured_field_defs()
-        sql_fields = [f"{k} {self.get_sql_type(v)}{v.get_max_length()}" for k, v in _fields.items()]
+        sql_fields = [f"{k} {self.get_sql_type(v)}{v.get_max_length()}{v.get_references()}" for k, v in _fields.items()]
         query = SQL(create_table_sql_template).format(SQL(model.__name__), SQL(", ".join(sql_fields)))
         return query
 
-    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> Any:
+    def _get_next_id_sql(self, model: Type[src.BaseModel], next_id: int) -> list[Any]:
+        next_id_sql_template = "SELECT setval(pg_get_serial_sequence('{}', 'id'), {}, false);"
+        return [SQL(next_id_sql_template).format(SQL(model.__name__.lower()), SQL(str(next_id)))]
+
+    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[Any]:
         alter_table_sql_template = "ALTER TABLE {} {}"
-        orgnl_fields = schema
+        actions = self._get_alter_actions(model, schema)
+        query = SQL(alter_table_sql_template).format(SQL(model.__name__), SQL(", ".join(actions)))
+        return [query]
+
+    def _get_migration_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[list[Any]]:
+        alter_table_sql_template = "ALTER TABLE {} {}"
+        actions = self._get_alter_actions(model, schema)
+        return [[SQL(alter_table_sql_template).format(SQL(model.__name__), SQL(action))] for action in actions]
+
+    def _get_alter_actions(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[str]:
+        """Returns the changes to the table's columns: added, then retyped, then dropped columns"""
+        orgnl_fields = dict(schema)
         orgnl_fields.pop("id")
         new_fields = model.get_configured_field_defs()
         new_set, orgnl_set = set(new_fields.keys()), set(orgnl_fields.keys())
-        actions = [f"DROP COLUMN {name}" for name in orgnl_set.difference(new_set)]
         to_add = [(key, new_fields[key]) for key in new_set.difference(orgnl_set)]
-        actions.extend([f"ADD COLUMN {k} {self.get_sql_type(v)}{v.get_max_length()}" for k, v in to_add])
+        actions = [f"ADD COLUMN {k} {self.get_sql_type(v)}{v.get_max_length()}{v.get_references()}" for k, v in to_add]
         to_upd = [(k, new_fields[k]) for k in new_set.intersection(orgnl_set) if new_fields[k] != orgnl_fields[k]]
         actions.extend([f"ALTER COLUMN {k} TYPE {self.get_sql_type(v)}{v.get_max_length()}" for k, v in to_upd])
-        query = SQL(alter_table_sql_template).format(SQL(model.__name__), SQL(", ".join(actions)))
-        return query
+        actions.extend([f"DROP COLUMN {name}" for name in orgnl_set.difference(new_set)])
+        return actions
 
     @classmethod
     def _create_field(cls, name: str, f_type: str, max_length: int) -> dict[str, src.Field]:
@@ -84,6 +290,9 @@ class PostgresDatabase(src.Database):
             "integer": src.IntField,
             "boolean": src.BoolField,
             "character varying": src.CharField,
+            "double precision": src.FloatField,
+            "timestamp without time zone": src.DateTimeField,
+            "bytea": src.BytesField,
         }
         field_func = field_mapping[f_type]
         return {name: field_func(max_length) if max_length else field_func()}
@@ -109,26 +318,40 @@ class PostgresDatabase(src.Database):
         query = SQL(update_sql_template).format(table_name, assignments)
         return query, tuple(field_values)
 
-    def fetch_results(self, model: Type[src.T], criterion: dict[str, Any], limit: int = 0) -> list[src.T]:
+    def _get_select_table_sql(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], limit: int = 0
+    ) -> tuple[Any, tuple[Any, ...]]:
         select_sql_template = "SELECT {} FROM {}{} ORDER BY id {};"
-        _fields = ["id"] + model.get_field_names()
-        where_clause = SQL(" WHERE " + " AND ".join([f"{f} = %s" for f in criterion.keys()])) if criterion else SQL("")
+        _fields = self._get_select_fields(model)
+        where_clause = SQL(" WHERE " + " AND ".join(self._get_conditions(criterion))) if criterion else SQL("")
         field_values = list(criterion.values()) if criterion else []
         limit_clause = SQL(f"LIMIT {limit}") if limit else SQL("")
         sel_fields = SQL(", ".join(_fields))
         tbl_name = SQL(model.__name__.lower())
-        ret = self._execute_query(
-            SQL(select_sql_template).format(sel_fields, tbl_name, where_clause, limit_clause),
-            tuple(field_values),
-        )
-        return [model(**dict(zip(_fields, row))) for row in ret]
+        query = SQL(select_sql_template).format(sel_fields, tbl_name, where_clause, limit_clause)
+        return query, tuple(field_values)
+
+    def _get_models_from_rows(self, model: Type[src.T], rows: list[tuple[Any, ...]]) -> list[src.T]:
+        _fields = self._get_select_fields(model)
+        return [model(**dict(zip(_fields, row))) for row in rows]
+
+    def _get_select_fields(self, model: Type[src.BaseModel]) -> list[str]:
+        return ["id"] + model.get_field_names()
 
     def get_sql_type(self, field: src.Field) -> str:
-        _types = {str: "varchar", int: "integer", bool: "boolean"}
+        _types = {
+            str: "varchar",
+            int: "integer",
+            bool: "boolean",
+            float: "double precision",
+            datetime: "timestamp",
+            bytes: "bytea",
+        }
         return _types[field.native_type]
 
     def _drop_tables(self, **kwargs: Any) -> None:
-        sql = "SELECT 'DROP TABLE IF EXISTS ' || tablename || ';' FROM pg_tables WHERE schemaname = 'public';"
+        self._clear_schema_cache()
+        sql = "SELECT 'DROP TABLE IF EXISTS ' || tablename || ' CASCADE;' FROM pg_tables WHERE schemaname = 'public';"
         drop_tables_sql = self._execute_query(sql)
         _ = [self._execute_update(sql[0]) for sql in drop_tables_sql]
         assert self._execute_query("SELECT COUNT(*) FROM pg_tables WHERE schemaname = 'public';") == [(0,)]
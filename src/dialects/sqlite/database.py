@@ -2,27 +2,77 @@ from __future__ import annotations
 
 import re
 import sqlite3
+import time
 from collections import ChainMap
+from contextlib import contextmanager
+from datetime import datetime
 from sqlite3 import Connection, Cursor
-from typing import Any, Callable, Type
+from typing import Any, Callable, Iterator, Type
 
 import src
 
 
 class SQLiteDatabase(src.Database):
+    placeholder = "?"
+    # Virtual machine instructions between checks of the statement timeout
+    progress_handler_steps = 1000
+    # SQLite only enforces the REFERENCES of foreign keys when they are switched on for the connection
+    foreign_keys = True
+
     def _init_connection(self, conn_details: src.DatabaseConfig) -> Any:
+        # A shared in-memory database only lives while a connection to it is open
+        if self._is_shared_memory(conn_details):
+            return sqlite3.connect(conn_details.host, uri=True, check_same_thread=False)
         return None
 
     def _get_connection(self) -> Connection:
-        return sqlite3.connect(self.conn_details.host)
+        conn = sqlite3.connect(self.conn_details.host, uri=self.conn_details.host.startswith("file:"))
+        if self.foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON;")
+        if self._is_shared_memory(self.conn_details):
+            # Connections sharing a cache lock tables instead of the file, which would fail reads during a write
+            conn.execute("PRAGMA read_uncommitted = 1;")
+        return conn
+
+    @staticmethod
+    def _is_shared_memory(conn_details: src.DatabaseConfig) -> bool:
+        return conn_details.host.startswith("file:") and "mode=memory" in conn_details.host
 
     def _execute_query(self, sql_query: Any, query_vars: tuple[Any, ...] | None = None) -> list[tuple[Any, ...]]:
         query_vars = query_vars or ()
-        with self._get_connection() as conn:
+        with self._get_connection() as conn, self._interrupt_after(conn, self._get_statement_timeout()):
             print(sql_query)
+            start = time.perf_counter()
             cur: Cursor = conn.execute(sql_query, query_vars)
+            executed = time.perf_counter()
             results: list[Any] = cur.fetchall()
-            return results
+            fetched = time.perf_counter()
+        self._record_statement(
+            sql_query,
+            str(sql_query),
+            query_vars,
+            execute_time=executed - start,
+            fetch_time=fetched - executed,
+            rows=len(results),
+        )
+        return results
+
+    @contextmanager
+    def _interrupt_after(self, conn: Connection, timeout: float) -> Iterator[None]:
+        """Interrupt the statement from SQLite's progress handler once it has run longer than the timeout"""
+        if not timeout:
+            yield
+            return
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, self.progress_handler_steps)
+        try:
+            yield
+        except sqlite3.OperationalError as err:
+            if time.monotonic() > deadline:
+                raise src.QueryTimeoutError(timeout) from err
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
 
     def _execute_update(
         self, sql_query: Any, query_vars: tuple[Any, ...] | None = None, insert_id: bool = False
@@ -30,42 +80,195 @@ class SQLiteDatabase(src.Database):
         query_vars = query_vars or ()
         with self._get_connection() as conn:
             print(sql_query)
+            start = time.perf_counter()
             cur: Cursor = conn.execute(sql_query, query_vars)
+            executed = time.perf_counter()
             result: int = cur.lastrowid if insert_id else cur.rowcount  # type: ignore
-            return result
+        self._record_statement(
+            sql_query, str(sql_query), query_vars, execute_time=executed - start, fetch_time=0.0, rows=cur.rowcount
+        )
+        return result
+
+    def _execute_updates(self, sql_queries: list[Any]) -> None:
+        timings = []
+        conn = self._get_connection()
+        # Without an explicit transaction, the sqlite3 module would commit DDL statements one by one
+        conn.isolation_level = None
+        # A rebuilt table is dropped while other tables still reference it, so the foreign keys are checked once the
+        # statements ran instead. They can only be switched off outside of a transaction
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            conn.execute("BEGIN")
+            for sql_query in sql_queries:
+                start = time.perf_counter()
+                cur: Cursor = conn.execute(sql_query)
+                timings.append((sql_query, time.perf_counter() - start, cur.rowcount))
+            if self.foreign_keys and conn.execute("PRAGMA foreign_key_check;").fetchone():
+                raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        for sql_query, execute_time, rowcount in timings:
+            self._record_statement(
+                sql_query, str(sql_query), (), execute_time=execute_time, fetch_time=0.0, rows=rowcount
+            )
+
+    def _bulk_insert(
+        self, model: Type[src.BaseModel], columns: list[str], batches: Iterator[list[tuple[Any, ...]]]
+    ) -> int:
+        return self._insert_batches(model, columns, batches)[0]
+
+    def _insert_rows(
+        self, model: Type[src.BaseModel], columns: list[str], rows: list[tuple[Any, ...]]
+    ) -> list[int] | None:
+        # The transaction holds the write lock, so the rows get consecutive ids ending with the last inserted one
+        count, last_id = self._insert_batches(model, columns, iter([rows]))
+        return list(range(last_id - count + 1, last_id + 1))
+
+    def _insert_batches(
+        self, model: Type[src.BaseModel], columns: list[str], batches: Iterator[list[tuple[Any, ...]]]
+    ) -> tuple[int, int]:
+        """Insert batches of rows on one connection, in one transaction. Returns the number of rows inserted and the
+        id of the last one"""
+        insert_sql = (
+            f"INSERT INTO {model.__name__.lower()} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))});"
+        )
+        fields = [model.get_all_field_defs()[column] for column in columns]
+        # Only datetimes have to be converted, so other rows are inserted as they are
+        convert = any(field == src.DateTimeField() for field in fields)
+        timings = []
+        count = 0
+        conn = self._get_connection()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN")
+            for batch in batches:
+                if convert:
+                    batch = [tuple(self._to_db_value(f, v) for f, v in zip(fields, row)) for row in batch]
+                start = time.perf_counter()
+                conn.executemany(insert_sql, batch)
+                timings.append((time.perf_counter() - start, len(batch)))
+                count += len(batch)
+            [(last_id,)] = conn.execute("SELECT last_insert_rowid();").fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        for execute_time, rowcount in timings:
+            self._record_statement(insert_sql, insert_sql, (), execute_time=execute_time, fetch_time=0.0, rows=rowcount)
+        return count, last_id
+
+    def _iter_query(
+        self, sql_query: Any, query_vars: tuple[Any, ...], chunk_size: int
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        conn = self._get_connection()
+        try:
+            cur: Cursor = conn.execute(sql_query, query_vars)
+            while rows := cur.fetchmany(chunk_size):
+                yield rows
+        finally:
+            conn.close()
+
+    @contextmanager
+    def open_blob(
+        self, model: Type[src.BaseModel], field: str, row_id: int, readonly: bool = True
+    ) -> Iterator[sqlite3.Blob]:
+        """Open a binary value of a row to read it in chunks, or overwrite it in place, instead of loading it into
+        memory at once. Writes can't change the size of the value"""
+        if model.get_all_field_defs().get(field) != src.BytesField():
+            raise src.InvalidFieldError(field, model.__name__)
+        conn = self._get_connection()
+        try:
+            with conn.blobopen(model.__name__.lower(), field, row_id, readonly=readonly) as blob:
+                yield blob
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _get_explain_sql(self, sql_query: Any) -> Any:
+        return f"EXPLAIN QUERY PLAN {sql_query}"
 
     def _get_table_schema(self, model: Type[src.BaseModel]) -> dict[str, src.Field]:
         describe_table_sql_template = "SELECT name, type as tpe FROM pragma_table_info(?)"
         results = self._execute_query(describe_table_sql_template, (model.__name__.lower(),))
         return dict(ChainMap(*[self._create_field(*col) for col in results]))
 
+    def _get_table_schemas(self, models: list[Type[src.BaseModel]]) -> dict[str, dict[str, src.Field]]:
+        describe_tables_sql_template = (
+            "SELECT m.name, p.name, p.type FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p "
+            f"WHERE m.type = 'table' AND m.name IN ({', '.join(['?'] * len(models))})"
+        )
+        results = self._execute_query(describe_tables_sql_template, tuple(model.__name__.lower() for model in models))
+        schemas: dict[str, dict[str, src.Field]] = {}
+        for table_name, *col in results:
+            schemas.setdefault(table_name, {}).update(self._create_field(*col))
+        return schemas
+
     def _create_field(self, name: str, tpe: str) -> dict[str, src.Field]:
         field_mapping: dict[str, Callable[..., Any]] = {
             "INTEGER": src.IntField,
             "BOOLEAN": src.BoolField,
             "VARCHAR": src.CharField,
+            "REAL": src.FloatField,
+            "DATETIME": src.DateTimeField,
+            "BLOB": src.BytesField,
         }
         f_type, max_length = self._get_field_length(tpe)
         field_func = field_mapping[f_type]
         return {name: field_func(max_length) if max_length else field_func()}
 
     def _get_field_length(self, tpe: str) -> tuple[str, int]:
-        result = re.search(r"^(VARCHAR|BOOLEAN|INTEGER)(\(([0-9]+)\))?", tpe)
+        result = re.search(r"^(VARCHAR|BOOLEAN|INTEGER|REAL|DATETIME|BLOB)(\(([0-9]+)\))?", tpe)
         return result.group(1), int(result.group(3)) if result.group(3) else 0  # type: ignore
 
-    def _get_create_table_sql(self, model: Type[src.BaseModel]) -> Any:
+    def _get_create_table_sql(self, model: Type[src.BaseModel], table_name: str | None = None) -> Any:
         _fields = model.get_configured_field_defs()
-        sql_fields = [f"{k} {self.get_sql_type(v)}{v.get_max_length()}" for k, v in _fields.items()]
-        tbl_name = model.__name__.lower()
+        sql_fields = [f"{k} {self.get_sql_type(v)}{v.get_max_length()}{v.get_references()}" for k, v in _fields.items()]
+        tbl_name = table_name or model.__name__.lower()
         return f"CREATE TABLE {tbl_name} (id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(sql_fields)});"
 
-    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> Any:
-        raise src.FeatureNotImplementedError("Modify table")
+    def _get_next_id_sql(self, model: Type[src.BaseModel], next_id: int) -> list[Any]:
+        # AUTOINCREMENT continues from the table's row in sqlite_sequence, which has no unique constraint on the name
+        tbl_name = model.__name__.lower()
+        return [
+            f"DELETE FROM sqlite_sequence WHERE name = '{tbl_name}';",
+            f"INSERT INTO sqlite_sequence (name, seq) VALUES ('{tbl_name}', {next_id - 1});",
+        ]
+
+    def _get_alter_table_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[Any]:
+        """SQLite can't change a column's type, so the table is rebuilt: the rows are copied to a new table with the
+        model's schema, which then replaces the old one"""
+        tbl_name = model.__name__.lower()
+        columns = ", ".join(["id", *(k for k in model.get_field_names() if k in schema)])
+        return [
+            self._get_create_table_sql(model, f"{tbl_name}__new"),
+            f"INSERT INTO {tbl_name}__new ({columns}) SELECT {columns} FROM {tbl_name};",
+            f"DROP TABLE {tbl_name};",
+            f"ALTER TABLE {tbl_name}__new RENAME TO {tbl_name};",
+        ]
+
+    def _get_migration_sql(self, model: Type[src.BaseModel], schema: dict[str, src.Field]) -> list[list[Any]]:
+        # Adding a nullable column only changes the schema, while any other change copies every row
+        new_fields = model.get_configured_field_defs()
+        if any(k not in new_fields or new_fields[k] != v for k, v in schema.items() if k != "id"):
+            return super()._get_migration_sql(model, schema)
+        tbl_name = model.__name__.lower()
+        return [
+            [f"ALTER TABLE {tbl_name} ADD COLUMN {k} {self.get_sql_type(v)}{v.get_max_length()}{v.get_references()};"]
+            for k, v in new_fields.items()
+            if k not in schema
+        ]
 
     def _get_insert_table_sql(self, model: src.BaseModel) -> tuple[Any, tuple[Any, ...]]:
         table_name = model.__class__.__name__.lower()
         field_dict = model.get_field_values()
-        field_values = list(field_dict.values())
+        _fields = model.get_all_field_defs()
+        field_values = [self._to_db_value(_fields[k], v) for k, v in field_dict.items()]
         field_name_lst = field_dict.keys()
         field_names = ", ".join(field_name_lst)
         field_placeholders = ",".join(["?"] * len(field_name_lst))
@@ -74,41 +277,55 @@ class SQLiteDatabase(src.Database):
     def _get_update_table_sql(self, model: src.BaseModel) -> tuple[Any, tuple[Any, ...]]:
         table_name = model.__class__.__name__.lower()
         field_dict = model.get_field_values()
-        field_values = list(field_dict.values())
+        _fields = model.get_all_field_defs()
+        field_values = [self._to_db_value(_fields[k], v) for k, v in field_dict.items()]
         assignments = ", ".join(f"{field} = ?" for field in field_dict)
         field_values.append(model.id)
         return f"UPDATE {table_name} SET {assignments} WHERE id = ?;", tuple(field_values)
 
-    def fetch_results(self, model: Type[src.T], criterion: dict[str, Any], limit: int = 0) -> list[src.T]:
+    def _get_select_table_sql(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], limit: int = 0
+    ) -> tuple[Any, tuple[Any, ...]]:
         _fields = model.get_all_field_defs()
-        where_clause = " WHERE " + " AND ".join([f"{f} = ?" for f in criterion.keys()]) if criterion else ""
-        field_values = list(criterion.values()) if criterion else []
+        where_clause = " WHERE " + " AND ".join(self._get_conditions(criterion)) if criterion else ""
+        field_values = [self._to_db_value(_fields[self._get_lookup(k)[0]], v) for k, v in criterion.items()]
         limit_clause = f"LIMIT {limit}" if limit else ""
         sel_fields = ", ".join(_fields.keys())
         tbl_name = model.__name__.lower()
-        sql = f"SELECT {sel_fields} FROM {tbl_name}{where_clause} ORDER BY id {limit_clause};"
-        ret = self._execute_query(sql, tuple(field_values))
+        return f"SELECT {sel_fields} FROM {tbl_name}{where_clause} ORDER BY id {limit_clause};", tuple(field_values)
+
+    def _get_models_from_rows(self, model: Type[src.T], rows: list[tuple[Any, ...]]) -> list[src.T]:
+        _fields = model.get_all_field_defs()
+        converters = [
+            (k, bool if val == src.BoolField() else self._get_value_converter(val)) for k, val in _fields.items()
+        ]
         return [
-            model(
-                **{
-                    k: bool(row[idx]) if val == src.BoolField() else row[idx]
-                    for idx, (k, val) in enumerate(_fields.items())
-                }
-            )
-            for row in ret
+            model(**{k: conv(row[idx]) if conv else row[idx] for idx, (k, conv) in enumerate(converters)})
+            for row in rows
         ]
-        # return [model(**dict(zip(_fields, row))) for row in ret]
+
+    def _to_db_value(self, field: src.Field, value: Any) -> Any:
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def _get_value_converter(self, field: src.Field) -> Callable[[Any], Any] | None:
+        if field == src.BoolField():
+            return lambda value: None if value is None else bool(value)
+        if field == src.DateTimeField():
+            return lambda value: None if value is None else datetime.fromisoformat(value)
+        return None
 
     def get_sql_type(self, field: src.Field) -> str:
-        _types = {str: "VARCHAR", int: "INTEGER", bool: "BOOLEAN"}
+        # SQLite has no date type, so datetimes are stored as ISO 8601 text, which sorts chronologically
+        _types = {str: "VARCHAR", int: "INTEGER", bool: "BOOLEAN", float: "REAL", datetime: "DATETIME", bytes: "BLOB"}
         return _types[field.native_type]
 
     def _drop_tables(self, **kwargs: Any) -> None:
+        self._clear_schema_cache()
         sql = (
             "SELECT 'DROP TABLE ' || name || ';' from sqlite_master WHERE type = 'table' and name != 'sqlite_sequence';"
         )
-        drop_tables_sql = self._execute_query(sql)
-        _ = [self._execute_update(sql[0]) for sql in drop_tables_sql]
+        # Dropped in one transaction, as a table referenced by another can't be dropped on its own
+        self._execute_updates([sql[0] for sql in self._execute_query(sql)])
         assert self._execute_query(
             "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' and name != 'sqlite_sequence';"
         ) == [(0,)]
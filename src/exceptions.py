@@ -18,11 +18,42 @@ class ValueNotInitializedError(Exception):
         super().__init__(f"Field '{field}' was not initialized")
 
 
+class RelationNotLoadedError(Exception):
+    def __init__(self, field: str):
+        super().__init__(f"Related model of field '{field}' was not loaded, use select_related or prefetch_related")
+
+
 class NoConnectionError(Exception):
     def __init__(self, exception: Any):
         super().__init__(exception)
 
 
+class QueryTimeoutError(Exception):
+    def __init__(self, timeout: float):
+        super().__init__(f"Statement cancelled after exceeding the timeout of {timeout} seconds")
+
+
+class WriterClosedError(Exception):
+    def __init__(self, model: str):
+        super().__init__(f"Buffered writer of {model} model is closed")
+
+
+class ShardKeyChangedError(Exception):
+    def __init__(self, field: str, model: str):
+        super().__init__(
+            f"Shard key '{field}' of saved {model} model was changed, which would move it to another shard"
+        )
+
+
 class FeatureNotImplementedError(Exception):
     def __init__(self, feature: str):
         super().__init__(f"Feature '{feature}' not implemented.")
+
+
+class NPlusOneQueryError(Exception):
+    def __init__(self, sql: str, count: int, call_site: str):
+        super().__init__(f"Statement executed {count} times with different parameters at {call_site}: {sql}")
+
+
+class NPlusOneQueryWarning(UserWarning):
+    pass
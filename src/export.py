@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import base64
+import csv
+import json
+from datetime import datetime
+from typing import IO, Any, Callable, Iterator
+
+Chunks = Iterator[list[tuple[Any, ...]]]
+
+
+def _write_csv(fields: list[str], chunks: Chunks, file: IO[str]) -> int:
+    writer = csv.writer(file)
+    writer.writerow(fields)
+    count = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def _write_jsonl(fields: list[str], chunks: Chunks, file: IO[str]) -> int:
+    count = 0
+    for rows in chunks:
+        file.writelines(json.dumps(dict(zip(fields, row)), default=str) + "\n" for row in rows)
+        count += len(rows)
+    return count
+
+
+def _write_columnar(fields: list[str], chunks: Chunks, file: IO[str]) -> int:
+    """A header line with the fields, followed by one line per chunk (row group) holding a list of values per field"""
+    file.write(json.dumps({"format": "columnar", "version": 1, "fields": fields}) + "\n")
+    count = 0
+    for rows in chunks:
+        columns = dict(zip(fields, map(list, zip(*rows))))
+        file.write(json.dumps({"rows": len(rows), "columns": columns}, default=str) + "\n")
+        count += len(rows)
+    return count
+
+
+def _to_text(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def format_chunks(chunks: Chunks, native_types: list[type]) -> Chunks:
+    """Convert the datetimes and binary values, which CSV and JSON have no type for, to ISO 8601 and base64 text.
+    Chunks without such columns are passed on as they are"""
+    if not any(native_type in (datetime, bytes) for native_type in native_types):
+        return chunks
+    return ([tuple(_to_text(value) for value in row) for row in rows] for rows in chunks)
+
+
+WRITERS: dict[str, Callable[[list[str], Chunks, IO[str]], int]] = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "columnar": _write_columnar,
+}
+
+
+def export_rows(fields: list[str], chunks: Chunks, path_or_file: str | IO[str], export_format: str) -> int:
+    """Write chunks of rows to a path or text file object, returning the number of rows written"""
+    if export_format not in WRITERS:
+        raise ValueError(f"Invalid export format provided: {export_format}.")
+    if isinstance(path_or_file, str):
+        with open(path_or_file, "w", newline="", encoding="utf-8") as file:
+            return WRITERS[export_format](fields, chunks, file)
+    return WRITERS[export_format](fields, chunks, path_or_file)
+
+
+def read_columnar(file: IO[str]) -> Iterator[dict[str, Any]]:
+    """Read back the rows of a columnar export, as dictionaries"""
+    fields = json.loads(file.readline())["fields"]
+    for line in file:
+        columns = json.loads(line)["columns"]
+        yield from (dict(zip(fields, row)) for row in zip(*(columns[field] for field in fields)))
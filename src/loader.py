@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import base64
+import csv
+import os
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, Type
+
+import src
+from src.models.fields import get_type_name
+
+TRUE_VALUES = {"true", "t", "1", "yes", "y"}
+FALSE_VALUES = {"false", "f", "0", "no", "n"}
+
+
+def _get_csv_parser(name: str, field: src.Field) -> Callable[[str], Any]:
+    """Returns the function parsing a CSV value of the field. Empty values are null, except for text fields"""
+
+    def parse_bool(value: str) -> bool | None:
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        raise src.InvalidFieldValueError(name, "bool", f"str '{value}'")
+
+    def parse_with(convert: Callable[[str], Any]) -> Callable[[str], Any]:
+        def parse(value: str) -> Any:
+            try:
+                return convert(value)
+            except ValueError as ex:
+                raise src.InvalidFieldValueError(name, field.native_type.__name__, f"str '{value}'") from ex
+
+        return parse
+
+    def parse_datetime(value: str) -> datetime:
+        result = datetime.fromisoformat(value)
+        # Rejected like a timezone-aware model value, as the datetime columns don't store the offset
+        if result.utcoffset() is not None:
+            raise ValueError(value)
+        return result
+
+    if field.native_type is str:
+        return lambda value: value
+    # Datetimes and binary values are read in the ISO 8601 and base64 text that exports write
+    parsers: dict[type, Callable[[str], Any]] = {
+        bool: parse_bool,
+        int: parse_with(int),
+        float: parse_with(float),
+        datetime: parse_with(parse_datetime),
+        bytes: parse_with(lambda value: base64.b64decode(value, validate=True)),
+    }
+    parser = parsers[field.native_type]
+    return lambda value: parser(value) if value else None
+
+
+def _get_columns(model: Type[src.BaseModel], columns: list[str]) -> list[str]:
+    field_defs = model.get_all_field_defs()
+    for column in columns:
+        if column not in field_defs:
+            raise src.InvalidFieldError(column, model.__name__)
+    for field in model.get_field_names():
+        if field not in columns:
+            raise src.ValueNotInitializedError(field)
+    # Ids are assigned by the database
+    return [column for column in columns if column != "id"]
+
+
+def _read_csv(model: Type[src.BaseModel], path: str | os.PathLike[str]) -> tuple[list[str], Iterator[tuple[Any, ...]]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        header = next(csv.reader(file), [])
+    columns = _get_columns(model, header)
+    field_defs = model.get_all_field_defs()
+    plan = [(header.index(column), _get_csv_parser(column, field_defs[column])) for column in columns]
+
+    def rows() -> Iterator[tuple[Any, ...]]:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                if len(row) != len(header):
+                    raise ValueError(f"Expected {len(header)} values on line {reader.line_num}, found {len(row)}.")
+                yield tuple(parse(row[idx]) for idx, parse in plan)
+
+    return columns, rows()
+
+
+def _read_iterable(
+    model: Type[src.BaseModel], source: Iterable[tuple[Any, ...] | dict[str, Any]]
+) -> tuple[list[str], Iterator[tuple[Any, ...]]]:
+    iterator = iter(source)
+    first = next(iterator, None)
+    if first is None:
+        return [], iter([])
+    if isinstance(first, dict):
+        columns = _get_columns(model, list(first))
+    else:
+        columns = model.get_field_names()
+    field_defs = model.get_all_field_defs()
+    validators = [(column, field_defs[column]) for column in columns]
+
+    def rows() -> Iterator[tuple[Any, ...]]:
+        for row in chain([first], iterator):
+            values = tuple(row[column] for column in columns) if isinstance(row, dict) else tuple(row)
+            if len(values) != len(columns):
+                raise ValueError(f"Expected {len(columns)} values ({', '.join(columns)}), found {len(values)}.")
+            for (column, field), value in zip(validators, values):
+                if not field.validate_value(value):
+                    type_name = get_type_name(value)
+                    raise src.InvalidFieldValueError(column, field.native_type.__name__, type_name)
+            yield values
+
+    return columns, rows()
+
+
+def read_rows(
+    model: Type[src.BaseModel], source: str | os.PathLike[str] | Iterable[tuple[Any, ...] | dict[str, Any]]
+) -> tuple[list[str], Iterator[tuple[Any, ...]]]:
+    """Returns the columns of the source, and an iterator of its rows with values checked against the fields. The
+    field definitions are resolved once per column, instead of validating a model instance per row"""
+    if isinstance(source, (str, os.PathLike)):
+        return _read_csv(model, source)
+    return _read_iterable(model, source)
+
+
+def batched(rows: Iterator[tuple[Any, ...]], batch_size: int) -> Iterator[list[tuple[Any, ...]]]:
+    while batch := list(islice(rows, batch_size)):
+        yield batch
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Type
+
+import src
+
+
+@dataclass(frozen=True)
+class BackfillProgress:
+    table: str
+    field: str
+    last_id: int
+    max_id: int
+    rows: int
+    batches: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id >= self.max_id
+
+
+def backfill(  # pylint: disable=R0913,R0914
+    db: src.Database,
+    model: Type[src.BaseModel],
+    field: str,
+    value: Any,
+    *,
+    batch_size: int = 1000,
+    throttle: float = 0.0,
+    progress: Callable[[BackfillProgress], None] | None = None,
+) -> int:
+    """Set a column to a value in id-range batches, each a short transaction of its own. Only null values are set,
+    so rows written by the new code in the meantime are kept, and an interrupted backfill can be run again.
+    Returns the number of rows updated"""
+    table = model.__name__.lower()
+    [(min_id, max_id)] = db._execute_query(f"SELECT MIN(id), MAX(id) FROM {table};")  # pylint: disable=W0212
+    if min_id is None:
+        return 0
+
+    placeholder = db.placeholder
+    update_sql = (
+        f"UPDATE {table} SET {field} = {placeholder} "
+        f"WHERE id >= {placeholder} AND id < {placeholder} AND {field} IS NULL;"
+    )
+    db_value = db._to_db_value(model.get_all_field_defs()[field], value)  # pylint: disable=W0212
+    rows = 0
+    for batch, start in enumerate(range(min_id, max_id + 1, batch_size), 1):
+        rows += db._execute_update(update_sql, (db_value, start, start + batch_size))  # pylint: disable=W0212
+        stats = BackfillProgress(table, field, min(start + batch_size - 1, max_id), max_id, rows, batch)
+        if progress is not None:
+            progress(stats)
+        if throttle and not stats.done:
+            time.sleep(throttle)
+    db._on_write(model)  # pylint: disable=W0212
+    return rows
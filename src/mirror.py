@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from typing import Any, Type
+
+import src
+
+
+class Mirror:  # pylint: disable=R0902
+    """Copy of a table in an in-memory SQLite database, which answers the table's reads in-process. Rows added since
+    the last refresh are fetched by id, and updated rows by the updated field if there is one. Other changes made
+    outside this process, like deletes, are picked up by a full reload every full_reload_interval seconds"""
+
+    def __init__(
+        self,
+        source: src.Database,
+        model: Type[src.BaseModel],
+        refresh_interval: float = 60.0,
+        updated_field: str | None = None,
+        full_reload_interval: float = 600.0,
+    ) -> None:
+        if updated_field is not None and updated_field not in model.get_field_names():
+            raise src.InvalidFieldError(updated_field, model.__name__)
+        self.source = source
+        self.model = model
+        self.refresh_interval = refresh_interval
+        self.updated_field = updated_field
+        self.full_reload_interval = full_reload_interval
+        table = model.__name__.lower()
+        self.db = src.SQLiteDatabase(
+            src.DatabaseConfig(
+                host=f"file:mirror_{table}_{uuid.uuid4().hex}?mode=memory&cache=shared",
+                user="",
+                password="",
+                database="",
+            )
+        )
+        # The tables referenced by the model's foreign keys aren't mirrored
+        self.db.foreign_keys = False
+        self.db.create_table(model)
+        self._table = table
+        self._columns = ["id", *model.get_field_names()]
+        self._max_id = 0
+        self._max_updated: Any = None
+        self._refreshed_at = float("-inf")
+        self._full_reloaded_at = float("-inf")
+        self._full_reload = True
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def is_stale(self) -> bool:
+        return self._full_reload or time.monotonic() - self._refreshed_at > self.refresh_interval
+
+    def invalidate(self, full: bool = False) -> None:
+        """Refresh before the next read. A full reload also picks up changes to existing rows without an updated
+        field, such as those written through the source database"""
+        self._full_reload = self._full_reload or full
+        self._generation += 1
+        self._refreshed_at = float("-inf")
+
+    def try_refresh(self) -> bool:
+        """Refresh if the mirror is stale and no other thread is refreshing it. Returns whether it is fresh, so
+        reads that find it isn't can go to the source database instead of waiting"""
+        if not self.is_stale():
+            return True
+        if not self._lock.acquire(blocking=False):  # pylint: disable=R1732
+            return False
+        try:
+            if self.is_stale():
+                self._refresh()
+            return True
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        refreshed_at, generation = time.monotonic(), self._generation
+        full_reload = self._full_reload or refreshed_at - self._full_reloaded_at > self.full_reload_interval
+        self._full_reload = False
+        try:
+            rows = self._fetch_rows(full_reload)
+            self._apply_rows(rows, full_reload)
+        except Exception:
+            self._full_reload = self._full_reload or full_reload
+            raise
+        if full_reload:
+            self._full_reloaded_at = refreshed_at
+        # A write during the refresh may have been missed, so the mirror stays stale
+        if generation == self._generation:
+            self._refreshed_at = refreshed_at
+
+    def _fetch_rows(self, full_reload: bool) -> list[tuple[Any, ...]]:
+        placeholder = self.source.placeholder
+        select_fields = self.source._get_select_fields(self.model)  # pylint: disable=W0212
+        select_sql = f"SELECT {', '.join(select_fields)} FROM {self._table}"
+        conditions: list[str] = []
+        query_vars: list[Any] = []
+        if not full_reload:
+            conditions.append(f"id > {placeholder}")
+            query_vars.append(self._max_id)
+            if self.updated_field is not None and self._max_updated is not None:
+                # Rows updated in the same tick as the last refresh are fetched again, which upserting allows
+                conditions.append(f"{self.updated_field} >= {placeholder}")
+                query_vars.append(self._max_updated)
+        if conditions:
+            select_sql += " WHERE " + " OR ".join(conditions)
+        rows = self.source._read_rows(select_sql + " ORDER BY id;", tuple(query_vars))  # pylint: disable=W0212
+        convert = self.source._get_row_converter(self.model)  # pylint: disable=W0212
+        return [convert(row) for row in rows] if convert else rows
+
+    def _apply_rows(self, rows: list[tuple[Any, ...]], full_reload: bool) -> None:
+        placeholders = ", ".join(["?"] * len(self._columns))
+        upsert_sql = f"INSERT OR REPLACE INTO {self._table} ({', '.join(self._columns)}) VALUES ({placeholders});"
+        _fields = self.model.get_all_field_defs()
+        fields = [_fields[column] for column in self._columns]
+        to_db_value = self.db._to_db_value  # pylint: disable=W0212
+        db_rows = [tuple(to_db_value(f, v) for f, v in zip(fields, row)) for row in rows]
+        conn = self.db._get_connection()  # pylint: disable=W0212
+        try:
+            # Rows are upserted instead of the table being emptied first, so concurrent reads never find it empty
+            with conn:
+                conn.executemany(upsert_sql, db_rows)
+                if full_reload:
+                    ids = {row[0] for row in rows}
+                    deleted = [(row[0],) for row in conn.execute(f"SELECT id FROM {self._table};") if row[0] not in ids]
+                    conn.executemany(f"DELETE FROM {self._table} WHERE id = ?;", deleted)
+        finally:
+            conn.close()
+        if full_reload:
+            self._max_id, self._max_updated = 0, None
+        if rows:
+            self._max_id = max(self._max_id, rows[-1][0])
+        if self.updated_field is not None:
+            idx = self._columns.index(self.updated_field)
+            values = [row[idx] for row in rows if row[idx] is not None]
+            if self._max_updated is not None:
+                values.append(self._max_updated)
+            self._max_updated = max(values, default=None)
@@ -1,6 +1,15 @@
-from typing import Any, Type
+from __future__ import annotations
 
-SupportedTypes = Type[str | int | bool]
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Type
+
+if TYPE_CHECKING:
+    from src.models.model import BaseModel
+
+SupportedTypes = Type[str | int | bool | float | datetime | bytes]
+
+# Binary values are read as memoryview or bytes, depending on the driver, and aren't copied to convert them
+BYTES_TYPES = (bytes, bytearray, memoryview)
 
 
 class Field:
@@ -16,10 +25,42 @@ class Field:
     def get_max_length(self) -> str:
         return f"({self.max_length})" if self.max_length else ""
 
+    def get_references(self) -> str:
+        return ""
+
     def validate_value(self, value: Any) -> bool:
+        if self.native_type is bytes:
+            return value is None or isinstance(value, BYTES_TYPES)
+        if self.native_type is float:
+            # Ints are converted to floats, but bools aren't taken for numbers
+            return value is None or isinstance(value, (int, float)) and not isinstance(value, bool)
+        if self.native_type is datetime:
+            # Postgres and MySQL datetime columns don't store an offset, so only naive datetimes round-trip
+            return value is None or isinstance(value, datetime) and value.utcoffset() is None
         return value is None or isinstance(value, self.native_type)
 
 
+def get_type_name(value: Any) -> str:
+    """Names the type of a value in errors, telling timezone-aware datetimes apart from the naive ones fields hold"""
+    if isinstance(value, datetime) and value.utcoffset() is not None:
+        return "timezone-aware datetime"
+    return type(value).__name__
+
+
+class RelatedField(Field):
+    """Integer column holding the id of a row in the table of another model"""
+
+    def __init__(self, to: Type[BaseModel]):
+        super().__init__(int)
+        self.to = to
+
+    def get_table_name(self) -> str:
+        return self.to.__name__.lower()
+
+    def get_references(self) -> str:
+        return f" REFERENCES {self.get_table_name()}(id)"
+
+
 def CharField(max_length: int = 0) -> Any:  # pylint: disable=invalid-name
     return Field(str, max_length)
 
@@ -30,3 +71,19 @@ def IntField() -> Any:  # pylint: disable=invalid-name
 
 def BoolField() -> Any:  # pylint: disable=invalid-name
     return Field(bool)
+
+
+def FloatField() -> Any:  # pylint: disable=invalid-name
+    return Field(float)
+
+
+def DateTimeField() -> Any:  # pylint: disable=invalid-name
+    return Field(datetime)
+
+
+def BytesField() -> Any:  # pylint: disable=invalid-name
+    return Field(bytes)
+
+
+def ForeignKey(to: Type[BaseModel]) -> Any:  # pylint: disable=invalid-name
+    return RelatedField(to)
@@ -1,19 +1,25 @@
 from __future__ import annotations
 
-from typing import Any, Dict, TypeVar
+import sys
+from typing import Any, Dict, Type, TypeVar
 
 # from src import Field, IntField, InvalidField, InvalidFieldValue, ValueNotInitialized
 import src
+from src.models.fields import get_type_name
 
 T = TypeVar("T", bound="BaseModel")
 
+# Model classes that can't be imported by name, by their definition. Unpickling in the process that pickled them
+# finds the original class, while other processes rebuild one from the definition
+_model_classes: dict[tuple[Any, ...], type[BaseModel]] = {}
+
 
 class BaseModel:
     id: int = src.IntField()
 
     def __init__(self, **kwargs: Any):
-        self._data: dict[str, Any] = {"id": None} | kwargs
-        self.validate_field_types(kwargs)
+        self._data: dict[str, Any] = {"id": None} | type(self).validate_field_types(kwargs)
+        self._related: dict[str, BaseModel | None] = {}
         self._validate_fields()
 
     def __getattribute__(self, name: str) -> Any:
@@ -40,9 +46,27 @@ class BaseModel:
         values_str = ", ".join(f"{k}={v!r}" for k, v in sorted(items))
         return f"{self.__class__.__name__}({values_str})"
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickled as the row tuple rather than the instance dict, which __getattribute__ hides
+        return _rebuild_model, (get_model_ref(self.__class__), self.to_row(), self._related)
+
     def to_dict(self) -> dict[str, Any]:
         return self._data
 
+    def to_row(self) -> tuple[Any, ...]:
+        """Returns the model's values as a row: the id followed by the model's fields"""
+        return (self._data["id"], *(self._data[name] for name in self.get_field_names()))
+
+    @classmethod
+    def from_row(cls: Type[T], row: tuple[Any, ...]) -> T:
+        return cls(**dict(zip(["id", *cls.get_field_names()], row)))
+
+    def get_related(self, field: str) -> BaseModel | None:
+        """Returns the model referenced by a foreign key, as loaded by select_related or prefetch_related"""
+        if field not in self._related:
+            raise src.RelationNotLoadedError(field)
+        return self._related[field]
+
     @classmethod
     def get_configured_field_defs(cls) -> Dict[str, src.Field]:
         return {k: v for k, v in vars(cls).items() if issubclass(type(v), src.Field)}
@@ -51,19 +75,30 @@ class BaseModel:
     def get_all_field_defs(cls) -> Dict[str, src.Field]:
         return {k: v for k, v in vars(cls).items() if issubclass(type(v), src.Field)} | {"id": src.IntField()}
 
+    @classmethod
+    def get_related_field_defs(cls) -> Dict[str, src.RelatedField]:
+        return {k: v for k, v in vars(cls).items() if isinstance(v, src.RelatedField)}
+
     @classmethod
     def get_field_names(cls) -> list[str]:
         return [k for k, v in vars(cls).items() if issubclass(type(v), src.Field)]
 
     @classmethod
-    def validate_field_types(cls, fields: Dict[str, Any]) -> None:
+    def validate_field_types(cls, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Raises an error for a value that doesn't fit its field. Returns the values, with ints given for float
+        fields converted to floats"""
         field_defs = cls.get_all_field_defs()
+        converted = {}
         for field, value in fields.items():
             if field not in field_defs.keys():
                 raise src.InvalidFieldError(field, cls.__name__)
             field_type = field_defs[field]
             if not field_type.validate_value(value):
-                raise src.InvalidFieldValueError(field, field_type.native_type.__name__, type(value).__name__)
+                type_name = get_type_name(value)
+                raise src.InvalidFieldValueError(field, field_type.native_type.__name__, type_name)
+            if field_type.native_type is float and isinstance(value, int):
+                converted[field] = float(value)
+        return fields | converted if converted else fields
 
     def _validate_fields(self) -> None:
         for field in self.get_field_names():
@@ -72,3 +107,44 @@ class BaseModel:
 
     def get_field_values(self) -> dict[str, Any]:
         return {name: self._data[name] for name in self.get_field_names()}
+
+
+def get_model_ref(model: Type[BaseModel]) -> Any:
+    """Returns a picklable reference to a model class: the class itself if it can be imported by name, otherwise its
+    definition, like for a model defined inside a function"""
+    obj: Any = sys.modules.get(model.__module__)
+    for name in model.__qualname__.split("."):
+        obj = getattr(obj, name, None)
+    if obj is model:
+        return model
+    fields = []
+    for name, field in model.get_configured_field_defs().items():
+        to: Any = None
+        if isinstance(field, src.RelatedField):
+            # A model referencing itself would otherwise recurse forever
+            to = "self" if field.to is model else get_model_ref(field.to)
+        fields.append((name, field.native_type, field.max_length, to))
+    model_ref = (model.__module__, model.__qualname__, tuple(fields))
+    _model_classes[model_ref] = model
+    return model_ref
+
+
+def resolve_model_ref(model_ref: Any) -> Type[BaseModel]:
+    if isinstance(model_ref, type):
+        return model_ref
+    if model_ref not in _model_classes:
+        module, qualname, fields = model_ref
+        model = type(qualname.rsplit(".", 1)[-1], (BaseModel,), {"__module__": module, "__qualname__": qualname})
+        for name, native_type, max_length, to in fields:
+            if to is None:
+                setattr(model, name, src.Field(native_type, max_length))
+            else:
+                setattr(model, name, src.RelatedField(model if to == "self" else resolve_model_ref(to)))
+        _model_classes[model_ref] = model
+    return _model_classes[model_ref]
+
+
+def _rebuild_model(model_ref: Any, row: tuple[Any, ...], related: dict[str, BaseModel | None]) -> BaseModel:
+    model = resolve_model_ref(model_ref).from_row(row)
+    model._related = related  # pylint: disable=W0212
+    return model
@@ -1,56 +1,201 @@
 from __future__ import annotations
 
-from typing import Any, Generic, Iterator, Type
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import IO, Any, Callable, Generic, Iterator, Type, TypeVar
 
+import src
 from src import Database
-from src.models.model import T
+from src.models.model import T, get_model_ref, resolve_model_ref
 
+R = TypeVar("R")
+
+
+def _map_rows(model_ref: Any, func: Callable[[Any], R], rows: list[tuple[Any, ...]]) -> list[R]:
+    model = resolve_model_ref(model_ref)
+    return [func(model.from_row(row)) for row in rows]
+
+
+class Query(Generic[T]):  # pylint: disable=R0902
+    """Lazily evaluated query. Queries are immutable: filter returns a new query and leaves this one untouched"""
 
-class Query(Generic[T]):
     def __init__(self, model: Type[T], db: Database):
         self.model = model
         self.db = db
         self._result_cache: list[T] = []
+        self._evaluated = False
         self._criteria: dict[str, Any] = {}
+        self._select_related: tuple[str, ...] = ()
+        self._prefetch_related: tuple[str, ...] = ()
+        self._timeout: float | None = None
+        self._lock = threading.Lock()
+
+    def _clone(self) -> Query[T]:
+        # pylint: disable=W0212
+        query: Query[T] = Query(self.model, self.db)
+        query._criteria = dict(self._criteria)
+        query._select_related = self._select_related
+        query._prefetch_related = self._prefetch_related
+        query._timeout = self._timeout
+        return query
+
+    def _fetch(self, limit: int = 0, cached: bool = True) -> list[T]:
+        with self.db.statement_timeout(self._timeout) if self._timeout is not None else nullcontext():
+            results = self.db.fetch_results(self.model, self._criteria, limit, self._select_related, cached)
+            if self._prefetch_related and results:
+                self.db.prefetch_related(self.model, results, self._prefetch_related)
+        return results
+
+    def _fetch_all(self) -> list[T]:
+        if not self._evaluated:
+            # Threads sharing the query wait for the first one to fetch, instead of each making a round trip
+            with self._lock:
+                if not self._evaluated:
+                    self._result_cache = self._fetch()
+                    self._evaluated = True
+        return self._result_cache
 
     def __len__(self) -> int:
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria)
-        return len(self._result_cache)
+        return len(self._fetch_all())
 
     def __iter__(self) -> Iterator[T]:
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria)
-        return self._result_cache.__iter__()
+        return self._fetch_all().__iter__()
 
     def __contains__(self, val: object) -> bool:
         if not isinstance(val, self.model):
             return False
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria)
-        return any(m.id == val.id for m in self._result_cache)
+        return any(m.id == val.id for m in self._fetch_all())
 
     def __getitem__(self, k: int) -> T:
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria)
-        return self._result_cache[k]
+        return self._fetch_all()[k]
 
-    def filter(self, **criteria: Any) -> "Query[T]":
+    def filter(self, **criteria: Any) -> Query[T]:
         self.model.validate_field_types(criteria)
-        if self._result_cache:
-            self._result_cache = [
+        query = self._clone()
+        # pylint: disable=W0212
+        query._criteria.update(criteria)
+        if self._evaluated:
+            query._result_cache = [
                 result for result in self._result_cache if all(getattr(result, k) == v for k, v in criteria.items())
             ]
-        else:
-            self._criteria.update(criteria)
-        return self
+            query._evaluated = True
+        return query
+
+    def select_related(self, *fields: str) -> Query[T]:
+        """Load the models referenced by the foreign key fields in the same query, with a join"""
+        self._validate_related_fields(fields)
+        query = self._clone()
+        query._select_related += fields  # pylint: disable=W0212
+        return query
+
+    def prefetch_related(self, *fields: str) -> Query[T]:
+        """Load the models referenced by the foreign key fields with one extra query per field"""
+        self._validate_related_fields(fields)
+        query = self._clone()
+        query._prefetch_related += fields  # pylint: disable=W0212
+        return query
+
+    def _validate_related_fields(self, fields: tuple[str, ...]) -> None:
+        related_defs = self.model.get_related_field_defs()
+        for field in fields:
+            if field not in related_defs:
+                raise src.InvalidFieldError(field, self.model.__name__)
+
+    def since(self, watermark: Any, field: str = "id") -> Query[T]:
+        """Only rows whose field is greater than the watermark, like the ids after the last one processed"""
+        self.model.validate_field_types({field: watermark})
+        query = self._clone()
+        query._criteria[f"{field}__gt"] = watermark  # pylint: disable=W0212
+        return query
+
+    def changes(  # pylint: disable=R0913
+        self,
+        watermark_field: str = "id",
+        batch_size: int = 1000,
+        *,
+        since: Any = None,
+        checkpoint: Callable[[Any], None] | None = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+        follow: bool = True,
+    ) -> Iterator[tuple[list[T], Any]]:
+        """Yield batches of new rows with the watermark after them, reading only the rows beyond the last watermark
+        instead of the whole table. Rows are read in id order, so the watermark field has to increase with the id,
+        like the id itself or a sequence number. Once the consumer is done with a batch, its watermark is passed to
+        checkpoint to be persisted. When caught up, polling backs off from poll_interval to max_poll_interval, or
+        the generator stops if not following. Polls always read the database, never a result cache or mirror that
+        doesn't see other processes' writes"""
+        watermark = since
+        delay = poll_interval
+        while True:
+            query = self if watermark is None else self.since(watermark, watermark_field)
+            rows = query._fetch(limit=batch_size, cached=False)  # pylint: disable=W0212
+            if rows:
+                watermark = max(getattr(row, watermark_field) for row in rows)
+                yield rows, watermark
+                if checkpoint is not None:
+                    checkpoint(watermark)
+                delay = poll_interval
+            if len(rows) < batch_size:
+                if not follow:
+                    return
+                time.sleep(delay)
+                if not rows:
+                    delay = min(delay * 2, max_poll_interval)
+
+    def timeout(self, seconds: float) -> Query[T]:
+        """Cancel the query's selects on the database server if they run longer than the given seconds"""
+        query = self._clone()
+        # pylint: disable=W0212
+        query._timeout = seconds
+        if self._evaluated:
+            query._result_cache = self._result_cache
+            query._evaluated = True
+        return query
+
+    def _validate_streamable(self, feature: str) -> None:
+        # Streamed rows come straight from one cursor, without the joins, extra queries or timeout of a fetch
+        if self._select_related or self._prefetch_related or self._timeout is not None:
+            raise src.FeatureNotImplementedError(f"{feature} of a query with related models or a timeout")
 
     def first(self) -> T:
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria, limit=1)
-        return self._result_cache[0]
+        if self._evaluated:
+            return self._result_cache[0]
+        return self._fetch(limit=1)[0]
 
     def all(self) -> list[T]:
-        if not self._result_cache:
-            self._result_cache = self.db.fetch_results(self.model, self._criteria)
-        return self._result_cache
+        return self._fetch_all()
+
+    def map_parallel(self, func: Callable[[T], R], processes: int | None = None, chunk_size: int = 1000) -> Iterator[R]:
+        """Yield func applied to every model of the query, in order, computed by a pool of processes. The rows are
+        streamed from a cursor and sent to the processes as chunks of raw tuples, which build the models there
+        instead of in this process. func has to be picklable, like a function defined at module level"""
+        self._validate_streamable("Parallel map")
+        model_ref = get_model_ref(self.model)
+        # Rows are only read ahead a few chunks per process, so memory stays bounded however large the result
+        max_pending = 2 * (processes or os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(processes)
+        pending: deque[Future[list[R]]] = deque()
+        try:
+            for rows in self.db.iter_rows(self.model, self._criteria, chunk_size):
+                pending.append(executor.submit(_map_rows, model_ref, func, rows))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def export(self, path_or_file: str | IO[str], export_format: str = "csv", chunk_size: int = 10000) -> int:
+        """Stream the query's rows to a csv, jsonl or columnar file without building model instances, so memory
+        stays bounded by the chunk size. Returns the number of rows written"""
+        self._validate_streamable("Export")
+        fields = ["id", *self.model.get_field_names()]
+        field_defs = self.model.get_all_field_defs()
+        chunks = self.db.iter_rows(self.model, self._criteria, chunk_size)
+        chunks = src.export.format_chunks(chunks, [field_defs[field].native_type for field in fields])
+        return src.export_rows(fields, chunks, path_or_file, export_format)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import threading
+import traceback
+import warnings
+from dataclasses import dataclass, field
+from typing import Any
+
+import src
+
+
+@dataclass
+class StatementProfile:
+    sql: str
+    params: tuple[Any, ...]
+    execute_time: float
+    fetch_time: float
+    rows: int
+    hydration_time: float = 0.0
+    explain: list[tuple[Any, ...]] | None = None
+
+    @property
+    def total_time(self) -> float:
+        return self.execute_time + self.fetch_time + self.hydration_time
+
+
+@dataclass
+class StatementStats:  # pylint: disable=R0902
+    sql: str
+    count: int = 0
+    total_time: float = 0.0
+    execute_time: float = 0.0
+    fetch_time: float = 0.0
+    hydration_time: float = 0.0
+    rows: int = 0
+    explain: list[tuple[Any, ...]] | None = field(default=None, repr=False)
+
+
+class Profiler:
+    """Collects a profile of every statement executed while Database.profile is active"""
+
+    def __init__(self, explain: bool = False) -> None:
+        self.explain = explain
+        self.statements: list[StatementProfile] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, node: src.Database, sql_query: Any, statement: StatementProfile) -> None:
+        if self.explain and statement.sql.lstrip().upper().startswith("SELECT"):
+            statement.explain = node._explain(sql_query, statement.params)  # pylint: disable=W0212
+        with self._lock:
+            self.statements.append(statement)
+
+    def report(self, top_n: int = 10) -> list[StatementStats]:
+        """Returns the statements aggregated by SQL, ordered by their total time"""
+        stats: dict[str, StatementStats] = {}
+        with self._lock:
+            statements = list(self.statements)
+        for statement in statements:
+            stat = stats.setdefault(statement.sql, StatementStats(statement.sql))
+            stat.count += 1
+            stat.total_time += statement.total_time
+            stat.execute_time += statement.execute_time
+            stat.fetch_time += statement.fetch_time
+            stat.hydration_time += statement.hydration_time
+            stat.rows += statement.rows
+            stat.explain = stat.explain or statement.explain
+        return sorted(stats.values(), key=lambda stat: stat.total_time, reverse=True)[:top_n]
+
+    def format_report(self, top_n: int = 10) -> str:
+        lines = [f"{'count':>6} {'total ms':>10} {'exec ms':>10} {'fetch ms':>10} {'hydrate ms':>10} {'rows':>8}  sql"]
+        for stat in self.report(top_n):
+            lines.append(
+                f"{stat.count:>6} {stat.total_time * 1000:>10.2f} {stat.execute_time * 1000:>10.2f} "
+                f"{stat.fetch_time * 1000:>10.2f} {stat.hydration_time * 1000:>10.2f} {stat.rows:>8}  {stat.sql}"
+            )
+            lines.extend(f"{'':>59}{' | '.join(str(col) for col in row)}" for row in stat.explain or [])
+        return "\n".join(lines)
+
+
+class NPlusOneDetector:
+    """Flags selects that are repeated with different parameters by one thread, like a lookup per row in a loop"""
+
+    actions = ("warn", "raise")
+
+    def __init__(self, threshold: int = 5, action: str = "warn") -> None:
+        if action not in self.actions:
+            raise ValueError(f"Invalid action provided: {action}.")
+        self.threshold = threshold
+        self.action = action
+        self.detected: list[tuple[str, int, str]] = []
+        self._params: dict[tuple[int, str], set[Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, node: src.Database, sql_query: Any, statement: StatementProfile) -> None:
+        if not statement.sql.lstrip().upper().startswith("SELECT"):
+            return
+        with self._lock:
+            params = self._params.setdefault((threading.get_ident(), statement.sql), set())
+            params.add(repr(statement.params))
+            if len(params) != self.threshold:
+                return
+            call_site = self._get_call_site()
+            self.detected.append((statement.sql, len(params), call_site))
+        if self.action == "raise":
+            raise src.NPlusOneQueryError(statement.sql, len(params), call_site)
+        warnings.warn(str(src.NPlusOneQueryError(statement.sql, len(params), call_site)), src.NPlusOneQueryWarning)
+
+    @staticmethod
+    def _get_call_site() -> str:
+        """Returns the innermost frame outside of the ORM, which is where the loop is"""
+        orm_dir = os.path.dirname(os.path.abspath(src.__file__))
+        for frame in reversed(traceback.extract_stack()):
+            if not os.path.abspath(frame.filename).startswith(orm_dir + os.sep):
+                return f"{frame.filename}:{frame.lineno} in {frame.name}"
+        return "unknown"
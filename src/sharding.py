@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import contextvars
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import chain, islice
+from typing import Any, Callable, Iterator, Type
+
+import src
+
+
+def default_shard_func(value: Any) -> int:
+    """Stable across processes, unlike the built-in hash of a string"""
+    if isinstance(value, int):
+        return value
+    return zlib.crc32(str(value).encode())
+
+
+class ShardedDatabase:
+    """Spreads a model's rows over several databases, routed by the value of a shard key field. Every shard assigns
+    ids from its own range of ids_per_shard ids, so ids are unique across shards and show which shard holds a row"""
+
+    def __init__(
+        self,
+        shards: list[src.Database],
+        shard_key: str,
+        shard_func: Callable[[Any], int] = default_shard_func,
+        ids_per_shard: int | None = None,
+    ) -> None:
+        self.shards = shards
+        self.shard_key = shard_key
+        self.shard_func = shard_func
+        # The id columns are 32-bit integers, so by default their range is split evenly between the shards
+        self.ids_per_shard = ids_per_shard or (2**31 - 1) // len(shards)
+        self._executor = ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="shard")
+
+    def get_shard(self, value: Any) -> src.Database:
+        return self.shards[self.shard_func(value) % len(self.shards)]
+
+    def get_shard_by_id(self, row_id: int) -> src.Database:
+        return self.shards[min((row_id - 1) // self.ids_per_shard, len(self.shards) - 1)]
+
+    def create_table(self, model: Type[src.BaseModel]) -> None:
+        list(self._executor.map(lambda idx: self._create_table(idx, model), range(len(self.shards))))
+
+    def _create_table(self, idx: int, model: Type[src.BaseModel]) -> None:
+        shard = self.shards[idx]
+        shard.create_table(model)
+        first_id = idx * self.ids_per_shard + 1
+        # pylint: disable=W0212
+        [(max_id,)] = shard._execute_query(f"SELECT MAX(id) FROM {model.__name__.lower()};")
+        if (max_id or 0) < first_id:
+            shard._execute_updates(shard._get_next_id_sql(model, first_id))
+
+    def save(self, model: src.BaseModel) -> None:
+        """New models are saved to the shard of their shard key, and saved ones to the shard their id is from"""
+        if self.shard_key not in model.get_field_names():
+            raise src.InvalidFieldError(self.shard_key, model.__class__.__name__)
+        shard = self.get_shard(getattr(model, self.shard_key))
+        if model.id and shard is not self.get_shard_by_id(model.id):
+            raise src.ShardKeyChangedError(self.shard_key, model.__class__.__name__)
+        shard.save(model)
+
+    def query(self, model: Type[src.T]) -> src.Query[src.T]:
+        return src.Query(model, self)  # type: ignore[arg-type]
+
+    def fetch_results(
+        self,
+        model: Type[src.T],
+        criterion: dict[str, Any],
+        limit: int = 0,
+        select_related: tuple[str, ...] = (),
+        cached: bool = True,
+    ) -> list[src.T]:
+        """Reads from a single shard if the shard key is filtered on, otherwise from all shards in parallel.
+        Related models are joined within a shard, so they have to be stored on the same shard"""
+        if self.shard_key in criterion:
+            shard = self.get_shard(criterion[self.shard_key])
+            return shard.fetch_results(model, criterion, limit, select_related, cached)
+        if criterion.get("id"):
+            return self.get_shard_by_id(criterion["id"]).fetch_results(model, criterion, limit, select_related, cached)
+
+        # Every shard applies the limit, and returns its rows ordered by id, so a k-way merge keeps the order
+        # Each shard runs in a copy of the caller's context, so a timeout set for the query applies to it too
+        futures = [
+            self._executor.submit(
+                contextvars.copy_context().run, shard.fetch_results, model, criterion, limit, select_related, cached
+            )
+            for shard in self.shards
+        ]
+        merged = heapq.merge(*(future.result() for future in futures), key=lambda result: result.id)
+        return list(islice(merged, limit or None))
+
+    def iter_rows(
+        self, model: Type[src.BaseModel], criterion: dict[str, Any], chunk_size: int = 1000
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        """Stream a model's rows in chunks from every shard, merged in id order like fetch_results"""
+        if self.shard_key in criterion:
+            yield from self.get_shard(criterion[self.shard_key]).iter_rows(model, criterion, chunk_size)
+            return
+        if criterion.get("id"):
+            yield from self.get_shard_by_id(criterion["id"]).iter_rows(model, criterion, chunk_size)
+            return
+        streams = [chain.from_iterable(shard.iter_rows(model, criterion, chunk_size)) for shard in self.shards]
+        merged = heapq.merge(*streams, key=lambda row: row[0])
+        while rows := list(islice(merged, chunk_size)):
+            yield rows
+
+    @contextmanager
+    def statement_timeout(self, seconds: float) -> Iterator[None]:
+        """Cancel selects executed on any shard by the current thread inside the block that run longer than the given
+        seconds"""
+        with ExitStack() as stack:
+            for shard in self.shards:
+                stack.enter_context(shard.statement_timeout(seconds))
+            yield
+
+    def prefetch_related(self, model: Type[src.T], results: list[src.T], fields: tuple[str, ...]) -> None:
+        raise src.FeatureNotImplementedError("Prefetch related across shards")
+
+    def close(self) -> None:
+        self._executor.shutdown()
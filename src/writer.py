@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Generic, Type
+
+import src
+from src.models.model import T
+
+_STOP = object()
+
+
+class BufferedWriter(Generic[T]):  # pylint: disable=R0902
+    """Saves models from a background thread, batching new rows into bulk inserts. A batch is written once it has
+    max_rows rows, or once its oldest row has waited max_latency_ms. save blocks while max_queue rows are waiting"""
+
+    def __init__(
+        self,
+        db: src.Database,
+        model: Type[T],
+        max_rows: int = 1000,
+        max_latency_ms: float = 100,
+        max_queue: int = 10000,
+    ) -> None:
+        self.db = db
+        self.model = model
+        self.max_rows = max_rows
+        self.max_latency = max_latency_ms / 1000
+        self._columns = model.get_field_names()
+        self._queue: queue.Queue[tuple[T, Future[T]] | threading.Event | object] = queue.Queue(max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"writer-{model.__name__.lower()}", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> BufferedWriter[T]:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def save(self, instance: T) -> Future[T]:
+        """Queue a model to be saved. The future resolves to the model once it is written, or to the row's error"""
+        if not isinstance(instance, self.model):
+            raise TypeError(f"Expected a {self.model.__name__} model, but found {type(instance).__name__} instead.")
+        future: Future[T] = Future()
+        # Queued under the lock, so nothing can be queued after close's stop marker and never be written
+        with self._close_lock:
+            if self._closed:
+                raise src.WriterClosedError(self.model.__name__)
+            self._queue.put((instance, future))
+        return future
+
+    def flush(self) -> None:
+        """Block until every model queued so far is written"""
+        flushed = threading.Event()
+        with self._close_lock:
+            if self._closed:
+                return
+            self._queue.put(flushed)
+        flushed.wait()
+
+    def close(self) -> None:
+        """Write the queued models and stop the background thread. Models can't be saved once closed"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        # Models taken from the queue that aren't written yet, followed by the flush or stop marker that ended the batch
+        pending: list[object] = []
+        try:
+            self._write_batches(pending)
+        except Exception as ex:  # pylint: disable=W0718
+            # The error reaches the callers through their futures, instead of leaving them waiting forever
+            self._fail(pending, ex)
+
+    def _write_batches(self, pending: list[object]) -> None:
+        while True:
+            pending.clear()
+            pending.append(self._queue.get())
+            deadline = time.monotonic() + self.max_latency
+            while isinstance(pending[-1], tuple) and len(pending) < self.max_rows:
+                try:
+                    pending.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            batch = [item for item in pending if isinstance(item, tuple)]
+            if batch:
+                self._write(batch)
+            if isinstance(pending[-1], threading.Event):
+                pending[-1].set()
+            elif pending[-1] is _STOP:
+                return
+
+    def _fail(self, pending: list[object], ex: Exception) -> None:
+        """Fail every queued model with the error that stopped the writer, and wake the threads waiting on it"""
+        self._closed = True
+        self._drain(pending, ex)
+        # A save that found the writer open may be blocked on the full queue, until the drain above made room
+        with self._close_lock:
+            self._drain([], ex)
+
+    def _drain(self, items: list[object], ex: Exception) -> None:
+        while True:
+            for item in items:
+                if isinstance(item, tuple) and not item[1].done():
+                    item[1].set_exception(ex)
+                elif isinstance(item, threading.Event):
+                    item.set()
+            try:
+                items = [self._queue.get_nowait()]
+            except queue.Empty:
+                return
+
+    def _write(self, batch: list[tuple[T, Future[T]]]) -> None:
+        # Models whose futures were cancelled aren't written
+        batch = [(instance, future) for instance, future in batch if future.set_running_or_notify_cancel()]
+        # Existing models are updates, which can't be part of a bulk insert
+        new = [(instance, future) for instance, future in batch if not instance.id]
+        existing = [(instance, future) for instance, future in batch if instance.id]
+        if new:
+            try:
+                rows = [tuple(instance.get_field_values()[column] for column in self._columns) for instance, _ in new]
+                ids = self.db._insert_rows(self.model, self._columns, rows)  # pylint: disable=W0212
+            except Exception:  # pylint: disable=W0718
+                # One bad row fails the whole batch, so the rows are saved one by one to find the errors
+                ids = None
+            if ids is None:
+                # Saving the rows one by one also gets their ids where the database can't return them from the batch
+                existing = new + existing
+            else:
+                self.db._on_write(self.model)  # pylint: disable=W0212
+                for (instance, future), row_id in zip(new, ids):
+                    instance.id = row_id
+                    future.set_result(instance)
+        for instance, future in existing:
+            try:
+                self.db.save(instance)
+            except Exception as ex:  # pylint: disable=W0718
+                future.set_exception(ex)
+            else:
+                future.set_result(instance)
@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 
 import src
@@ -63,3 +65,30 @@ def test_compare_fields() -> None:
     assert field != src.Field(int)
     assert field != src.Field(str, max_length=32)
     assert field != "invalid"
+
+
+def test_pickle_model() -> None:
+    class Author(src.BaseModel):
+        name: str = src.CharField(max_length=32)
+
+    class Book(src.BaseModel):
+        name: str = src.CharField(max_length=32)
+        author: int = src.ForeignKey(Author)
+
+    book = Book(name="Animal Farm", author=1)
+    book.id = 2
+    book._related["author"] = Author(name="George Orwell")  # pylint: disable=W0212
+
+    # Models defined in a function can't be imported by name, so they are pickled with their definition
+    copy = pickle.loads(pickle.dumps(book))
+    assert type(copy) is Book
+    assert repr(copy) == "Book(author=1, id=2, name='Animal Farm')"
+    assert repr(copy.get_related("author")) == "Author(name='George Orwell')"
+
+    # Another process finds no such class, and rebuilds one with the same fields
+    data = pickle.dumps(book)
+    src.models.model._model_classes.clear()  # pylint: disable=W0212
+    rebuilt = pickle.loads(data)
+    assert type(rebuilt) is not Book
+    assert type(rebuilt).get_all_field_defs() == Book.get_all_field_defs()
+    assert rebuilt.to_row() == (2, "Animal Farm", 1)
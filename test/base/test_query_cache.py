@@ -0,0 +1,61 @@
+import time
+
+import src
+
+
+def test_lru_eviction() -> None:
+    cache = src.QueryCache(max_size=2)
+    key_a = cache.make_key("book", ["id"], {"name": "a"}, 0)
+    key_b = cache.make_key("book", ["id"], {"name": "b"}, 0)
+    key_c = cache.make_key("book", ["id"], {"name": "c"}, 0)
+    assert key_a and key_b and key_c
+
+    cache.set(key_a, [(1,)], cache.generation("book"))
+    cache.set(key_b, [(2,)], cache.generation("book"))
+    # Reading key a makes key b the least recently used entry
+    assert cache.get(key_a) == [(1,)]
+    cache.set(key_c, [(3,)], cache.generation("book"))
+
+    assert len(cache) == 2
+    assert cache.get(key_b) is None
+    assert cache.get(key_c) == [(3,)]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_ttl_expiry() -> None:
+    cache = src.QueryCache(ttl=0.05)
+    key = cache.make_key("book", ["id"], {}, 1)
+    assert key
+    cache.set(key, [(1,)], cache.generation("book"))
+    assert cache.get(key) == [(1,)]
+    time.sleep(0.1)
+    assert cache.get(key) is None
+
+
+def test_invalidate_table() -> None:
+    cache = src.QueryCache()
+    book_key = cache.make_key("book", ["id"], {}, 0)
+    author_key = cache.make_key("author", ["id"], {}, 0)
+    assert book_key and author_key
+    cache.set(book_key, [(1,)], cache.generation("book"))
+    cache.set(author_key, [(1,)], cache.generation("author"))
+
+    cache.invalidate("book")
+    assert cache.get(book_key) is None
+    assert cache.get(author_key) == [(1,)]
+
+
+def test_stale_rows_not_stored() -> None:
+    cache = src.QueryCache()
+    key = cache.make_key("book", ["id"], {}, 0)
+    assert key
+
+    # A write invalidates the table while the rows were being read
+    generation = cache.generation("book")
+    cache.invalidate("book")
+    cache.set(key, [(1,)], generation)
+    assert cache.get(key) is None
+
+
+def test_unhashable_criteria_not_cached() -> None:
+    assert src.QueryCache.make_key("book", ["id"], {"name": ["a"]}, 0) is None
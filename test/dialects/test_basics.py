@@ -1,5 +1,6 @@
 # pylint: disable=W0212
 from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any
 
 import pytest
 
@@ -146,7 +147,48 @@ class TestBasic:
         assert str(books[0]) == "{'id': 2, 'name': '1984', 'author': 'George Orwell', 'available': True}"
         assert str(books[1]) == "{'id': 3, 'name': 'Animal Farm', 'author': 'George Orwell', 'available': True}"
 
-        # Can filter on previously filtered query after evaluation
-        books.filter(name="Animal Farm")
-        assert len(books) == 1
-        assert str(books[0]) == "{'id': 3, 'name': 'Animal Farm', 'author': 'George Orwell', 'available': True}"
+        # Can filter on previously filtered query after evaluation, without changing the original query
+        animal_farm = books.filter(name="Animal Farm")
+        assert len(books) == 2
+        assert len(animal_farm) == 1
+        assert str(animal_farm[0]) == "{'id': 3, 'name': 'Animal Farm', 'author': 'George Orwell', 'available': True}"
+
+    def test_filter_returns_new_query(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name = src.CharField()
+            available = src.BoolField()
+
+        db.create_table(Book)
+
+        db.save(Book(name="1984", available=True))
+        db.save(Book(name="Animal Farm", available=False))
+
+        # A shared base query can be reused, since filtering doesn't modify it
+        books = db.query(Book)
+        available = books.filter(available=True)
+        unavailable = books.filter(available=False)
+        assert [b.name for b in available] == ["1984"]
+        assert [b.name for b in unavailable] == ["Animal Farm"]
+        assert len(books) == 2
+
+    def test_empty_result_is_cached(self, db: src.Database, monkeypatch: pytest.MonkeyPatch) -> None:
+        class Book(src.BaseModel):
+            name = src.CharField()
+
+        db.create_table(Book)
+
+        calls = []
+        fetch_results = db.fetch_results
+
+        def counting_fetch_results(*args: Any, **kwargs: Any) -> Any:
+            calls.append(args)
+            return fetch_results(*args, **kwargs)
+
+        monkeypatch.setattr(db, "fetch_results", counting_fetch_results)
+
+        # A query that returned no rows is only evaluated once
+        books = db.query(Book).filter(name="1984")
+        assert len(books) == 0
+        assert not list(books)
+        assert Book(name="1984") not in books
+        assert len(calls) == 1
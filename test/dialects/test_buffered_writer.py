@@ -0,0 +1,117 @@
+import threading
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any
+
+import pytest
+
+import src
+
+
+class Reading(src.BaseModel):
+    sensor: str = src.CharField(max_length=32)
+    value: int = src.IntField()
+
+
+class TestBufferedWriter:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_batched_writes(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        with db.profile() as profiler, src.BufferedWriter(db, Reading, max_rows=10, max_latency_ms=1000) as writer:
+            futures = [writer.save(Reading(sensor="a", value=value)) for value in range(25)]
+            writer.flush()
+            assert all(future.done() for future in futures)
+
+        assert [reading.value for reading in db.query(Reading)] == list(range(25))
+        # Two full batches, and the rest written by the flush
+        inserts = [
+            stat for stat in profiler.report() if "reading" in stat.sql.lower() and "select" not in stat.sql.lower()
+        ]
+        assert sum(stat.count for stat in inserts) == 3
+
+    def test_latency_flush(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        writer = src.BufferedWriter(db, Reading, max_rows=100, max_latency_ms=20)
+        future = writer.save(Reading(sensor="a", value=1))
+        assert future.result(timeout=5).sensor == "a"
+        assert len(db.query(Reading)) == 1
+        writer.close()
+
+    def test_saved_ids(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        db.save(Reading(sensor="a", value=0))
+        with src.BufferedWriter(db, Reading, max_rows=10) as writer:
+            futures = [writer.save(Reading(sensor="b", value=value)) for value in range(1, 6)]
+        saved = [future.result() for future in futures]
+
+        assert {reading.id: reading.value for reading in saved} == {
+            reading.id: reading.value for reading in db.query(Reading).filter(sensor="b")
+        }
+        # Saving a written model again updates its row instead of inserting another one
+        saved[0].value = 10
+        db.save(saved[0])
+        assert [(reading.id, reading.value) for reading in db.query(Reading)] == [
+            (1, 0),
+            (2, 10),
+            (3, 2),
+            (4, 3),
+            (5, 4),
+            (6, 5),
+        ]
+
+    def test_row_errors(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        existing = Reading(sensor="a", value=0)
+        db.save(existing)
+        existing.value = 10
+
+        with src.BufferedWriter(db, Reading) as writer:
+            futures = [writer.save(Reading(sensor="a", value=value)) for value in [1, 2**70, 3]]
+            update = writer.save(existing)
+
+        assert futures[0].result().value == 1
+        # The integer is out of the column's range
+        assert futures[1].exception() is not None
+        assert futures[2].result().value == 3
+        assert update.result() is existing
+        assert sorted(reading.value for reading in db.query(Reading)) == [1, 3, 10]
+
+    def test_closed_writer(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        writer = src.BufferedWriter(db, Reading)
+        writer.close()
+        with pytest.raises(src.WriterClosedError):
+            writer.save(Reading(sensor="a", value=1))
+        with pytest.raises(TypeError):
+            src.BufferedWriter(db, Reading).save(src.BaseModel())  # type: ignore[arg-type]
+
+    def test_cancelled_save(self, db: src.Database) -> None:
+        db.create_table(Reading)
+        with src.BufferedWriter(db, Reading, max_rows=100, max_latency_ms=1000) as writer:
+            cancelled = writer.save(Reading(sensor="a", value=1))
+            assert cancelled.cancel()
+            future = writer.save(Reading(sensor="a", value=2))
+            writer.flush()
+
+        assert future.result().value == 2
+        assert [reading.value for reading in db.query(Reading)] == [2]
+
+    def test_writer_error(self, db: src.Database, monkeypatch: pytest.MonkeyPatch) -> None:
+        db.create_table(Reading)
+        writer = src.BufferedWriter(db, Reading, max_rows=1)
+
+        saved = threading.Event()
+
+        def fail(batch: list[Any]) -> None:
+            saved.wait(5)
+            raise RuntimeError("Writer failed")
+
+        monkeypatch.setattr(writer, "_write", fail)
+        futures = [writer.save(Reading(sensor="a", value=value)) for value in range(3)]
+        saved.set()
+        # The stopped writer wakes the flush instead of leaving it waiting
+        writer.flush()
+        assert all(isinstance(future.exception(timeout=5), RuntimeError) for future in futures)
+        with pytest.raises(src.WriterClosedError):
+            writer.save(Reading(sensor="a", value=3))
+        writer.close()
@@ -0,0 +1,67 @@
+import threading
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any, Type
+
+import src
+
+
+class Event(src.BaseModel):
+    name: str = src.CharField(max_length=32)
+    sequence: int = src.IntField()
+
+
+class TestChanges:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_since(self, db: src.Database) -> None:
+        db.create_table(Event)
+        for sequence in range(1, 6):
+            db.save(Event(name=f"event {sequence}", sequence=sequence * 10))
+
+        assert [event.sequence for event in db.query(Event).since(3)] == [40, 50]
+        assert [event.id for event in db.query(Event).since(20, field="sequence").filter(name="event 4")] == [4]
+
+    def test_batches_and_checkpoint(self, db: src.Database) -> None:
+        db.create_table(Event)
+        for sequence in range(1, 6):
+            db.save(Event(name=f"event {sequence}", sequence=sequence))
+        checkpoints: list[Any] = []
+
+        batches = list(db.query(Event).changes(batch_size=2, checkpoint=checkpoints.append, follow=False))
+        assert [([event.id for event in rows], watermark) for rows, watermark in batches] == [
+            ([1, 2], 2),
+            ([3, 4], 4),
+            ([5], 5),
+        ]
+        assert checkpoints == [2, 4, 5]
+
+        # Resuming from the persisted watermark only reads the new rows
+        db.save(Event(name="event 6", sequence=6))
+        changes = db.query(Event).changes("sequence", since=checkpoints[-1], follow=False)
+        assert [[event.name for event in rows] for rows, _ in changes] == [["event 6"]]
+
+    def test_follow(self, db: src.Database) -> None:
+        db.create_table(Event)
+        db.save(Event(name="event 1", sequence=1))
+        changes = db.query(Event).filter(name="event 2").changes(poll_interval=0.01, max_poll_interval=0.05)
+
+        timer = threading.Timer(0.1, lambda: db.save(Event(name="event 2", sequence=2)))
+        timer.start()
+        rows, watermark = next(changes)
+        timer.join()
+        assert ([event.name for event in rows], watermark) == (["event 2"], 2)
+
+    def test_polls_bypass_cache(self, db: src.Database, db_type: Type[src.Database]) -> None:
+        db.create_table(Event)
+        db.save(Event(name="event 1", sequence=1))
+        reader = db_type(db.conn_details, query_cache=src.QueryCache())
+        reader.mirror(Event)
+        changes = reader.query(Event).changes(poll_interval=0.01, max_poll_interval=0.05)
+        assert [event.id for event in next(changes)[0]] == [1]
+
+        # Writes through another database don't invalidate the reader's cache or mirror
+        timer = threading.Timer(0.1, lambda: db.save(Event(name="event 2", sequence=2)))
+        timer.start()
+        rows, watermark = next(changes)
+        timer.join()
+        assert ([event.name for event in rows], watermark) == (["event 2"], 2)
@@ -0,0 +1,89 @@
+# pylint: disable=W0212
+import dataclasses
+import sqlite3
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import psycopg2.errors
+import pytest
+
+import src
+
+# The error each dialect raises for a table named after a reserved word
+SYNTAX_ERRORS: dict[type[src.Database], type[Exception]] = {
+    src.PostgresDatabase: psycopg2.errors.SyntaxError,
+    src.SQLiteDatabase: sqlite3.OperationalError,
+}
+
+
+class TestCreateTables:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_create_tables(self, db: src.Database) -> None:
+        class Author(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            active: bool = src.BoolField()
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            author: int = src.ForeignKey(Author)
+
+        # The referenced table is created first, even though it is passed last
+        with db.profile() as profiler:
+            db.create_tables(Book, Author)
+        # One catalog query for both tables and one statement per table
+        assert len(profiler.statements) == 3
+        assert db._get_table_schemas([Book, Author]) == {
+            "author": {"id": src.IntField(), "name": src.CharField(max_length=32), "active": src.BoolField()},
+            "book": {"id": src.IntField(), "name": src.CharField(max_length=32), "author": src.IntField()},
+        }
+
+        author = Author(name="George Orwell", active=True)
+        db.save(author)
+        db.save(Book(name="1984", author=author.id))
+        assert db.query(Book).select_related("author").first().get_related("author").name == "George Orwell"
+
+    def test_schema_cache(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_tables(Book)
+
+        # Repeat calls are answered from the schema cache, without querying the database
+        with db.profile() as profiler:
+            db.create_tables(Book)
+            db.create_tables(Book)
+        assert not profiler.statements
+
+        with db.profile() as profiler:
+            db.create_tables(Book, use_cache=False)
+        assert len(profiler.statements) == 1
+
+
+class TestSchemaCacheKey:
+    databases = [SQLITE_CONFIG]
+
+    def test_schema_cache_per_server(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_tables(Book)
+        assert db._is_schema_cached(Book)
+        # A server on another port of the same host has its own tables
+        other = type(db)(dataclasses.replace(db.conn_details, port=5433))
+        assert not other._is_schema_cached(Book)
+
+
+class TestCreateTablesTransaction:
+    databases = [POSTGRESS_CONFIG, SQLITE_CONFIG]
+
+    def test_failed_create_tables_rolls_back(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        # ORDER is a reserved word, so its table can't be created
+        class Order(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        with pytest.raises(SYNTAX_ERRORS[type(db)]):
+            db.create_tables(Book, Order)
+        assert not db._get_table_schema(Book)
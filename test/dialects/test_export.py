@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from pathlib import Path
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any
+
+import pytest
+
+import src
+
+
+class TestExport:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def _create_books(self, db: src.Database) -> Any:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            pages: int = src.IntField()
+            available: bool = src.BoolField()
+
+        db.create_table(Book)
+        db.save(Book(name="1984", pages=328, available=True))
+        db.save(Book(name="Animal Farm", pages=112, available=False))
+        db.save(Book(name="Homage to Catalonia", pages=232, available=True))
+        return Book
+
+    def test_export_csv(self, db: src.Database, tmp_path: Path) -> None:
+        Book = self._create_books(db)  # pylint: disable=C0103
+
+        path = str(tmp_path / "books.csv")
+        assert db.query(Book).filter(available=True).export(path, chunk_size=1) == 2
+        with open(path, encoding="utf-8") as file:
+            assert list(csv.reader(file)) == [
+                ["id", "name", "pages", "available"],
+                ["1", "1984", "328", "True"],
+                ["3", "Homage to Catalonia", "232", "True"],
+            ]
+
+    def test_export_jsonl(self, db: src.Database) -> None:
+        Book = self._create_books(db)  # pylint: disable=C0103
+
+        file = io.StringIO()
+        assert db.query(Book).export(file, "jsonl", chunk_size=2) == 3
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        assert lines[1] == {"id": 2, "name": "Animal Farm", "pages": 112, "available": False}
+        assert [line["id"] for line in lines] == [1, 2, 3]
+
+    def test_export_columnar(self, db: src.Database) -> None:
+        Book = self._create_books(db)  # pylint: disable=C0103
+
+        file = io.StringIO()
+        assert db.query(Book).export(file, "columnar", chunk_size=2) == 3
+        # One line for the header and one per row group
+        assert len(file.getvalue().splitlines()) == 3
+        file.seek(0)
+        assert list(src.read_columnar(file)) == [book.to_dict() for book in db.query(Book)]
+
+    def test_export_invalid_format(self, db: src.Database) -> None:
+        Book = self._create_books(db)  # pylint: disable=C0103
+
+        with pytest.raises(ValueError):
+            db.query(Book).export(io.StringIO(), "xml")
+
+    def test_export_unsupported_query(self, db: src.Database) -> None:
+        Book = self._create_books(db)  # pylint: disable=C0103
+
+        with pytest.raises(src.FeatureNotImplementedError):
+            db.query(Book).timeout(5).export(io.StringIO())
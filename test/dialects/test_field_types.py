@@ -0,0 +1,105 @@
+# pylint: disable=W0212
+import io
+from datetime import datetime, timedelta, timezone
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import pytest
+
+import src
+
+
+class Measurement(src.BaseModel):
+    value: float = src.FloatField()
+    taken_at: datetime = src.DateTimeField()
+    payload: bytes = src.BytesField()
+
+
+class TestFieldTypes:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_round_trip(self, db: src.Database) -> None:
+        db.create_table(Measurement)
+        taken_at = datetime(2024, 2, 29, 13, 45, 30, 123456)
+        db.save(Measurement(value=21.5, taken_at=taken_at, payload=b"\x00\xffdata"))
+        db.save(Measurement(value=None, taken_at=None, payload=None))
+
+        first, second = db.query(Measurement).all()
+        assert (first.value, first.taken_at, bytes(first.payload)) == (21.5, taken_at, b"\x00\xffdata")
+        assert (second.value, second.taken_at, second.payload) == (None, None, None)
+        assert db.query(Measurement).filter(taken_at=taken_at).first().id == first.id
+
+    def test_int_float_value(self, db: src.Database) -> None:
+        db.create_table(Measurement)
+        measurement = Measurement(value=3, taken_at=None, payload=None)
+        assert isinstance(measurement.value, float)
+        db.save(measurement)
+
+        assert db.query(Measurement).filter(value=3).first().value == 3.0
+        with pytest.raises(src.InvalidFieldValueError):
+            Measurement(value=True, taken_at=None, payload=None)
+
+    def test_aware_datetime(self, db: src.Database, tmp_path: str) -> None:
+        db.create_table(Measurement)
+        taken_at = datetime(2024, 2, 29, 13, 45, 30, tzinfo=timezone(timedelta(hours=2)))
+
+        # The offset would be dropped by the Postgres and MySQL columns, so aware values are rejected everywhere
+        with pytest.raises(src.InvalidFieldValueError, match="timezone-aware datetime"):
+            Measurement(value=1.0, taken_at=taken_at, payload=None)
+        with pytest.raises(src.InvalidFieldValueError):
+            db.query(Measurement).filter(taken_at=taken_at)
+        with pytest.raises(src.InvalidFieldValueError):
+            db.load(Measurement, [(1.0, taken_at, None)])
+        path = f"{tmp_path}/measurements.csv"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"value,taken_at,payload\n1.0,{taken_at.isoformat()},\n")
+        with pytest.raises(src.InvalidFieldValueError):
+            db.load(Measurement, path)
+        assert not db.query(Measurement).all()
+
+    def test_schema(self, db: src.Database) -> None:
+        db.create_table(Measurement)
+        assert db._get_table_schema(Measurement) == Measurement.get_all_field_defs()
+
+    def test_validation(self) -> None:
+        Measurement(value=1.0, taken_at=datetime.now(), payload=memoryview(b"data"))
+        with pytest.raises(src.InvalidFieldValueError):
+            Measurement(value=1.0, taken_at="2024-01-01", payload=b"")
+        with pytest.raises(src.InvalidFieldValueError):
+            Measurement(value=1.0, taken_at=datetime.now(), payload="data")
+
+    def test_export_and_load(self, db: src.Database, tmp_path: str) -> None:
+        db.create_table(Measurement)
+        taken_at = datetime(2024, 2, 29, 13, 45, 30)
+        db.save(Measurement(value=0.25, taken_at=taken_at, payload=b"\x01\x02"))
+        path = f"{tmp_path}/measurements.csv"
+        db.query(Measurement).export(path)
+
+        assert db.load(Measurement, path) == 1
+        loaded = db.query(Measurement).all()[1]
+        assert (loaded.value, loaded.taken_at, bytes(loaded.payload)) == (0.25, taken_at, b"\x01\x02")
+
+        buffer = io.StringIO()
+        db.query(Measurement).export(buffer, "jsonl")
+        assert '"payload": "AQI="' in buffer.getvalue()
+        assert '"taken_at": "2024-02-29T13:45:30"' in buffer.getvalue()
+
+
+class TestSQLiteBlob:
+    databases = [SQLITE_CONFIG]
+
+    def test_open_blob(self, db: src.SQLiteDatabase) -> None:
+        db.create_table(Measurement)
+        measurement = Measurement(value=1.0, taken_at=datetime.now(), payload=bytes(range(256)) * 4)
+        db.save(measurement)
+
+        with db.open_blob(Measurement, "payload", measurement.id) as blob:
+            chunks = [blob.read(100) for _ in range(11)]
+        assert b"".join(chunks) == bytes(range(256)) * 4
+
+        with db.open_blob(Measurement, "payload", measurement.id, readonly=False) as blob:
+            blob.write(b"\xff\xfe")
+        assert bytes(db.query(Measurement).first().payload[:3]) == b"\xff\xfe\x02"
+
+        with pytest.raises(src.InvalidFieldError):
+            with db.open_blob(Measurement, "value", measurement.id):
+                pass
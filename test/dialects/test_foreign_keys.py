@@ -0,0 +1,106 @@
+import sqlite3
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any
+
+import mysql.connector
+import psycopg2.errors
+import pytest
+
+import src
+
+# The error each dialect raises for a foreign key referencing a row that doesn't exist
+FOREIGN_KEY_ERRORS: dict[type[src.Database], type[Exception]] = {
+    src.PostgresDatabase: psycopg2.errors.ForeignKeyViolation,
+    src.MySQLDatabase: mysql.connector.errors.IntegrityError,
+    src.SQLiteDatabase: sqlite3.IntegrityError,
+}
+
+
+class TestForeignKeys:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def _create_books(self, db: src.Database) -> tuple[type[src.BaseModel], Any]:
+        class Author(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            author: int = src.ForeignKey(Author)
+            editor: int = src.ForeignKey(Author)
+
+        db.create_table(Author)
+        db.create_table(Book)
+        orwell, huxley = Author(name="George Orwell"), Author(name="Aldous Huxley")
+        db.save(orwell)
+        db.save(huxley)
+        db.save(Book(name="1984", author=orwell.id, editor=huxley.id))
+        db.save(Book(name="Brave New World", author=huxley.id, editor=None))
+        db.save(Book(name="Animal Farm", author=orwell.id, editor=orwell.id))
+        return Author, Book
+
+    def test_foreign_key_schema(self, db: src.Database) -> None:
+        _, Book = self._create_books(db)  # pylint: disable=C0103
+
+        # A foreign key is stored as an integer column
+        assert db._get_table_schema(Book)["author"] == src.IntField()  # pylint: disable=W0212
+        db.create_table(Book)
+
+    def test_select_related(self, db: src.Database) -> None:
+        _, Book = self._create_books(db)  # pylint: disable=C0103
+
+        with db.profile() as profiler:
+            books = db.query(Book).select_related("author", "editor").all()
+            assert [(b.name, b.get_related("author").name) for b in books] == [
+                ("1984", "George Orwell"),
+                ("Brave New World", "Aldous Huxley"),
+                ("Animal Farm", "George Orwell"),
+            ]
+            assert [b.get_related("editor") and b.get_related("editor").name for b in books] == [
+                "Aldous Huxley",
+                None,
+                "George Orwell",
+            ]
+        assert len(profiler.statements) == 1
+
+        book = db.query(Book).select_related("author").filter(name="Animal Farm").first()
+        assert book.to_dict()["author"] == book.get_related("author").id
+
+    def test_prefetch_related(self, db: src.Database) -> None:
+        _, Book = self._create_books(db)  # pylint: disable=C0103
+
+        with db.profile() as profiler:
+            books = db.query(Book).prefetch_related("author", "editor").all()
+            assert [b.get_related("author").name for b in books] == ["George Orwell", "Aldous Huxley", "George Orwell"]
+            assert books[1].get_related("editor") is None
+        # One query for the books, and one per relation
+        assert len(profiler.statements) == 3
+
+    def test_related_not_loaded(self, db: src.Database) -> None:
+        _, Book = self._create_books(db)  # pylint: disable=C0103
+
+        book = db.query(Book).first()
+        with pytest.raises(src.RelationNotLoadedError):
+            book.get_related("author")
+        with pytest.raises(src.InvalidFieldError):
+            db.query(Book).select_related("name")
+
+    def test_invalid_reference(self, db: src.Database) -> None:
+        _, Book = self._create_books(db)  # pylint: disable=C0103
+
+        with pytest.raises(FOREIGN_KEY_ERRORS[type(db)]):
+            db.save(Book(name="Homage to Catalonia", author=999, editor=None))
+        with pytest.raises(FOREIGN_KEY_ERRORS[type(db)]):
+            db.load(Book, [("Homage to Catalonia", 999, None)])
+        assert len(db.query(Book)) == 3
+
+    def test_alter_referenced_table(self, db: src.Database) -> None:
+        self._create_books(db)
+
+        # SQLite rebuilds the table, which the books still reference
+        class Author(src.BaseModel):
+            name: str = src.CharField(max_length=64)
+
+        db.create_table(Author)
+        assert db.query(Author).filter(id=1).first().name == "George Orwell"
+        with pytest.raises(FOREIGN_KEY_ERRORS[type(db)]):
+            db._execute_update("DELETE FROM author;")  # pylint: disable=W0212
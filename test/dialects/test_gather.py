@@ -0,0 +1,87 @@
+import sqlite3
+import threading
+from test.dialects import DATABASE, MYSQL_CONFIG, PASSWORD, POSTGRESS_CONFIG, SQLITE_CONFIG, USER
+from typing import Any, Type
+
+import mysql.connector
+import psycopg2.errors
+import pytest
+
+import src
+
+# The error each dialect raises for a query on a table that doesn't exist
+MISSING_TABLE_ERRORS: dict[type[src.Database], type[Exception]] = {
+    src.PostgresDatabase: psycopg2.errors.UndefinedTable,
+    src.MySQLDatabase: mysql.connector.errors.ProgrammingError,
+    src.SQLiteDatabase: sqlite3.OperationalError,
+}
+
+
+class TestGather:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_gather_returns_results_in_order(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, maxconn=3)
+        db = db_type(conn_details)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            pages: int = src.IntField()
+
+        db.create_table(Book)
+        for name, pages in [("1984", 328), ("Animal Farm", 112), ("Homage to Catalonia", 232)]:
+            db.save(Book(name=name, pages=pages))
+
+        queries = [db.query(Book).filter(pages=pages) for pages in [232, 328, 1, 112]]
+        results = db.gather(*queries)
+        assert [[book.name for book in result] for result in results] == [
+            ["Homage to Catalonia"],
+            ["1984"],
+            [],
+            ["Animal Farm"],
+        ]
+        # The queries are evaluated, so they don't fetch again
+        assert queries[0][0].name == "Homage to Catalonia"
+
+    def test_gather_runs_concurrently(
+        self, db_type: Type[src.Database], db_hostname: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        conn_details = src.DatabaseConfig(host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, maxconn=3)
+        db = db_type(conn_details)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        # Each read waits until all three are running, which would time out if they ran one after another
+        barrier = threading.Barrier(3, timeout=5)
+        read_rows = db._read_rows  # pylint: disable=W0212
+
+        def read_rows_together(*args: Any) -> list[tuple[Any, ...]]:
+            barrier.wait()
+            return read_rows(*args)
+
+        monkeypatch.setattr(db, "_read_rows", read_rows_together)
+        results = db.gather(*[db.query(Book) for _ in range(3)])
+        assert [[book.name for book in result] for result in results] == [["1984"]] * 3
+
+    def test_gather_errors(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        class Author(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        # The author table was never created
+        with pytest.raises(MISSING_TABLE_ERRORS[type(db)]):
+            db.gather(db.query(Book), db.query(Author))
+
+        book_results, author_results = db.gather(db.query(Book), db.query(Author), return_exceptions=True)
+        assert [book.name for book in book_results] == ["1984"]
+        assert isinstance(author_results, MISSING_TABLE_ERRORS[type(db)])
+        assert db.gather() == []
@@ -0,0 +1,72 @@
+from pathlib import Path
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Any
+
+import pytest
+
+import src
+
+
+class TestLoad:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def _create_table(self, db: src.Database) -> Any:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            pages: int = src.IntField()
+            available: bool = src.BoolField()
+
+        db.create_table(Book)
+        return Book
+
+    def test_load_csv(self, db: src.Database, tmp_path: Path) -> None:
+        Book = self._create_table(db)  # pylint: disable=C0103
+
+        path = tmp_path / "books.csv"
+        path.write_text(
+            'available,name,pages\ntrue,1984,328\nfalse,"Animal Farm, a Fairy Story",112\n1,"Say ""hi""",\n',
+            encoding="utf-8",
+        )
+        assert db.load(Book, str(path), batch_size=2) == 3
+        assert [book.to_dict() for book in db.query(Book)] == [
+            {"id": 1, "name": "1984", "pages": 328, "available": True},
+            {"id": 2, "name": "Animal Farm, a Fairy Story", "pages": 112, "available": False},
+            {"id": 3, "name": 'Say "hi"', "pages": None, "available": True},
+        ]
+
+    def test_load_iterables(self, db: src.Database) -> None:
+        Book = self._create_table(db)  # pylint: disable=C0103
+
+        assert db.load(Book, [("1984", 328, True), ("Animal Farm", 112, False)]) == 2
+        rows = ({"name": f"Book {idx}", "pages": idx, "available": idx % 2 == 0} for idx in range(5))
+        assert db.load(Book, rows, batch_size=2) == 5
+        assert db.load(Book, []) == 0
+
+        books = db.query(Book).all()
+        assert len(books) == 7
+        assert books[1].to_dict() == {"id": 2, "name": "Animal Farm", "pages": 112, "available": False}
+        assert books[6].to_dict() == {"id": 7, "name": "Book 4", "pages": 4, "available": True}
+
+    def test_load_invalid_rows(self, db: src.Database, tmp_path: Path) -> None:
+        Book = self._create_table(db)  # pylint: disable=C0103
+
+        with pytest.raises(src.InvalidFieldValueError):
+            db.load(Book, [("1984", 328, True), ("Animal Farm", "112", False)])
+        with pytest.raises(src.InvalidFieldError):
+            db.load(Book, [{"name": "1984", "pages": 328, "available": True, "author": "George Orwell"}])
+        with pytest.raises(src.ValueNotInitializedError):
+            db.load(Book, [{"name": "1984", "pages": 328}])
+
+        path = tmp_path / "books.csv"
+        path.write_text("name,pages,available\n1984,many,true\n", encoding="utf-8")
+        with pytest.raises(src.InvalidFieldValueError):
+            db.load(Book, str(path))
+        path.write_text("name,pages,available\n1984,328,true\nAnimal Farm,112\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="line 3"):
+            db.load(Book, str(path))
+        path.write_text("name,pages,author\n1984,328,George Orwell\n", encoding="utf-8")
+        with pytest.raises(src.InvalidFieldError):
+            db.load(Book, str(path))
+
+        # Nothing is inserted when a batch fails
+        assert len(db.query(Book)) == 0
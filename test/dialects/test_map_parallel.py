@@ -0,0 +1,56 @@
+import pickle
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import pytest
+
+import src
+
+
+class Book(src.BaseModel):
+    name: str = src.CharField(max_length=32)
+    pages: int = src.IntField()
+
+
+def describe(book: src.BaseModel) -> str:
+    return f"{type(book).__name__} {book.id}: {book.name} ({book.pages})"  # type: ignore
+
+
+class TestMapParallel:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_map_parallel(self, db: src.Database) -> None:
+        db.create_table(Book)
+        for idx in range(1, 11):
+            db.save(Book(name=f"book {idx}", pages=idx * 10))
+
+        results = list(db.query(Book).filter(name="book 3").map_parallel(describe, processes=2))
+        assert results == ["Book 3: book 3 (30)"]
+
+        results = list(db.query(Book).map_parallel(describe, processes=2, chunk_size=3))
+        assert results == [f"Book {idx}: book {idx} ({idx * 10})" for idx in range(1, 11)]
+
+    def test_map_parallel_local_model(self, db: src.Database) -> None:
+        class Author(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            pages: int = src.IntField()
+
+        db.create_table(Author)
+        db.save(Author(name="George Orwell", pages=328))
+
+        # The model can't be imported by the processes, so they rebuild it from its definition
+        assert list(db.query(Author).map_parallel(describe, processes=1)) == ["Author 1: George Orwell (328)"]
+
+    def test_pickle_loaded_model(self, db: src.Database) -> None:
+        db.create_table(Book)
+        db.save(Book(name="Atomic Habits", pages=324))
+
+        book = db.query(Book).first()
+        copy = pickle.loads(pickle.dumps(book))
+        assert type(copy) is Book
+        assert copy.to_row() == book.to_row() == (1, "Atomic Habits", 324)
+
+    def test_map_parallel_unsupported_query(self, db: src.Database) -> None:
+        db.create_table(Book)
+
+        with pytest.raises(src.FeatureNotImplementedError):
+            list(db.query(Book).timeout(5).map_parallel(describe))
@@ -0,0 +1,69 @@
+# pylint: disable=W0212
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import src
+
+
+class TestMigrate:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_backfill(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        for idx in range(5):
+            db.save(Book(name=f"book {idx}"))
+        db.save(Book(name="book 5"))
+        progress: list[src.BackfillProgress] = []
+
+        Book.pages = src.IntField()  # type: ignore
+        db.migrate(
+            Book,
+            backfill={"pages": 100},
+            batch_size=2,
+            throttle=0.001,
+            progress=progress.append,
+        )
+
+        assert db._get_table_schema(Book)["pages"] == src.IntField()
+        assert [book.pages for book in db.query(Book)] == [100] * 6
+        assert [(stats.field, stats.batches, stats.rows, stats.last_id) for stats in progress] == [
+            ("pages", 1, 2, 2),
+            ("pages", 2, 4, 4),
+            ("pages", 3, 6, 6),
+        ]
+        assert progress[-1].done and not progress[0].done
+
+    def test_backfill_keeps_written_values(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="Atomic Habits"))
+        Book.pages = src.IntField()  # type: ignore
+        db.migrate(Book)
+        db.save(Book(name="Deep Work", pages=296))  # type: ignore
+
+        assert src.migration.backfill(db, Book, "pages", 0) == 1
+        assert [book.pages for book in db.query(Book)] == [0, 296]
+
+    def test_retype_and_drop(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+            pages: int = src.IntField()
+            available: bool = src.BoolField()
+
+        db.create_table(Book)
+        db.save(Book(name="Atomic Habits", pages=324, available=True))
+
+        delattr(Book, "available")
+        Book.name = src.CharField(max_length=64)
+        db.migrate(Book)
+
+        assert db._get_table_schema(Book) == {
+            "id": src.IntField(),
+            "name": src.CharField(max_length=64),
+            "pages": src.IntField(),
+        }
+        assert [(book.id, book.name, book.pages) for book in db.query(Book)] == [(1, "Atomic Habits", 324)]
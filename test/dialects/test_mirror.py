@@ -0,0 +1,82 @@
+# pylint: disable=W0212
+import time
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+from typing import Type
+
+import src
+
+
+class Country(src.BaseModel):
+    code: str = src.CharField(max_length=2)
+    name: str = src.CharField(max_length=32)
+    active: bool = src.BoolField()
+    version: int = src.IntField()
+
+
+class TestMirror:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    @staticmethod
+    def _save_countries(db: src.Database) -> None:
+        db.create_table(Country)
+        db.save(Country(code="ZA", name="South Africa", active=True, version=1))
+        db.save(Country(code="NL", name="Netherlands", active=False, version=1))
+
+    def test_reads_are_local(self, db: src.Database) -> None:
+        self._save_countries(db)
+        db.mirror(Country)
+
+        with db.profile() as profiler:
+            assert [country.name for country in db.query(Country)] == ["South Africa", "Netherlands"]
+            country = db.query(Country).filter(code="NL").first()
+        assert (country.name, country.active) == ("Netherlands", False)
+        assert not profiler.statements
+
+    def test_write_through_database(self, db: src.Database) -> None:
+        self._save_countries(db)
+        db.mirror(Country)
+        country = db.query(Country).filter(code="NL").first()
+        country.name = "The Netherlands"
+        db.save(country)
+        db.save(Country(code="DE", name="Germany", active=True, version=1))
+
+        assert [country.name for country in db.query(Country)] == ["South Africa", "The Netherlands", "Germany"]
+
+    def test_incremental_refresh(self, db: src.Database, db_type: Type[src.Database]) -> None:
+        self._save_countries(db)
+        db.mirror(Country, refresh_interval=0.05, updated_field="version")
+        # Writes through another database aren't seen until the refresh interval has passed
+        other_db = db_type(db.conn_details)
+        other_db.save(Country(code="DE", name="Germany", active=True, version=1))
+        netherlands = other_db.query(Country).filter(code="NL").first()
+        netherlands.name = "The Netherlands"
+        netherlands.version = 2
+        other_db.save(netherlands)
+        assert len(db.query(Country)) == 2
+
+        time.sleep(0.1)
+        assert [country.name for country in db.query(Country)] == ["South Africa", "The Netherlands", "Germany"]
+
+    def test_full_reload(self, db: src.Database, db_type: Type[src.Database]) -> None:
+        self._save_countries(db)
+        db.mirror(Country, refresh_interval=0.05, full_reload_interval=0.2)
+        # Changes through another database without an updated field are only seen after a full reload
+        other_db = db_type(db.conn_details)
+        netherlands = other_db.query(Country).filter(code="NL").first()
+        netherlands.name = "The Netherlands"
+        other_db.save(netherlands)
+        other_db._execute_update(f"DELETE FROM country WHERE id = {other_db.placeholder};", (1,))
+        time.sleep(0.1)
+        assert [country.name for country in db.query(Country)] == ["South Africa", "Netherlands"]
+
+        time.sleep(0.2)
+        assert [country.name for country in db.query(Country)] == ["The Netherlands"]
+
+    def test_stale_mirror_falls_back(self, db: src.Database) -> None:
+        self._save_countries(db)
+        mirror = db.mirror(Country)
+        mirror.invalidate()
+        # Another thread is refreshing the mirror, so reads go to the source database
+        with mirror._lock, db.profile() as profiler:
+            assert len(db.query(Country)) == 2
+        assert len(profiler.statements) == 1
@@ -0,0 +1,48 @@
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import pytest
+
+import src
+
+
+class TestNPlusOne:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_lookup_per_row_raises(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        for idx in range(5):
+            db.save(Book(name=f"Book {idx}"))
+
+        with pytest.raises(src.NPlusOneQueryError, match="test_n_plus_one.py"):
+            with db.detect_n_plus_one(threshold=3, action="raise"):
+                for book in db.query(Book):
+                    db.query(Book).filter(id=book.id).first()
+
+    def test_lookup_per_row_warns(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        for idx in range(5):
+            db.save(Book(name=f"Book {idx}"))
+
+        with pytest.warns(src.NPlusOneQueryWarning):
+            with db.detect_n_plus_one(threshold=3) as detector:
+                for book in db.query(Book):
+                    db.query(Book).filter(id=book.id).first()
+        assert len(detector.detected) == 1
+
+    def test_repeated_identical_query_is_not_flagged(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        with db.detect_n_plus_one(threshold=3, action="raise") as detector:
+            for _ in range(5):
+                db.query(Book).filter(name="1984").first()
+        assert not detector.detected
@@ -0,0 +1,77 @@
+# pylint: disable=W0212
+import gc
+import os
+import time
+from test.dialects import DATABASE, MYSQL_CONFIG, PASSWORD, POSTGRESS_CONFIG, SQLITE_CONFIG, USER
+from typing import Type
+
+import src
+
+SESSION_ID_QUERIES = {
+    "PostgresDatabase": "SELECT pg_backend_pid();",
+    "MySQLDatabase": "SELECT CONNECTION_ID();",
+}
+KILL_SESSION_QUERIES = {
+    "PostgresDatabase": "SELECT pg_terminate_backend({});",
+    "MySQLDatabase": "KILL {};",
+}
+
+
+class Book(src.BaseModel):
+    name: str = src.CharField(max_length=32)
+
+
+class TestForkSafety:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_child_process_creates_own_pool(self, db: src.Database) -> None:
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+        parent_pool = db.conn
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                db.save(Book(name="Animal Farm"))
+                # SQLite connects per statement, so it has no pool to replace
+                ok = (parent_pool is None or db.conn is not parent_pool) and len(db.query(Book)) == 2
+                # os._exit skips the interpreter's cleanup, so the inherited pool is freed here instead
+                parent_pool = None
+                src.database._inherited_pools.clear()
+                gc.collect()
+            except Exception:  # pylint: disable=W0718
+                ok = False
+            os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        # The parent's connections weren't closed by the child, nor their sessions ended on the server
+        assert db.conn is parent_pool
+        assert [book.name for book in db.query(Book)] == ["1984", "Animal Farm"]
+        db.save(Book(name="Brave New World"))
+        assert len(db.query(Book)) == 3
+
+
+class TestPoolHealth:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG]
+
+    def test_max_age(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(
+            host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, max_age=0.05
+        )
+        db = db_type(conn_details)
+        session_id = db._execute_query(SESSION_ID_QUERIES[db_type.__name__])
+        assert db._execute_query(SESSION_ID_QUERIES[db_type.__name__]) == session_id
+        time.sleep(0.1)
+        assert db._execute_query(SESSION_ID_QUERIES[db_type.__name__]) != session_id
+
+    def test_dropped_connection(self, db: src.Database, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(
+            host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, ping_interval=0
+        )
+        pinged_db = db_type(conn_details)
+        [(session_id,)] = pinged_db._execute_query(SESSION_ID_QUERIES[db_type.__name__])
+        db._execute_update(KILL_SESSION_QUERIES[db_type.__name__].format(session_id))
+        time.sleep(0.1)
+
+        assert pinged_db._execute_query("SELECT 1;") == [(1,)]
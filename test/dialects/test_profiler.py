@@ -0,0 +1,54 @@
+from test.dialects import MYSQL_CONFIG, POSTGRESS_CONFIG, SQLITE_CONFIG
+
+import src
+
+
+class TestProfiler:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_profile_statements(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+
+        with db.profile() as profiler:
+            db.save(Book(name="1984"))
+            db.save(Book(name="Animal Farm"))
+            assert len(db.query(Book)) == 2
+            db.query(Book).filter(name="1984").first()
+
+        # Statements outside the block aren't recorded
+        db.query(Book).all()
+
+        assert len(profiler.statements) == 4
+        insert, _, select_all, select_first = profiler.statements
+        assert insert.sql.upper().startswith("INSERT")
+        assert insert.params == ("1984",)
+        assert select_all.sql.upper().startswith("SELECT")
+        assert select_all.rows == 2
+        assert select_all.hydration_time > 0
+        assert select_first.params == ("1984",)
+        assert select_first.explain is None
+        assert all(s.execute_time > 0 and s.total_time >= s.execute_time for s in profiler.statements)
+
+        report = profiler.report(top_n=2)
+        assert len(report) == 2
+        assert report[0].total_time >= report[1].total_time
+        insert_stats = next(stat for stat in profiler.report() if stat.sql == insert.sql)
+        assert insert_stats.count == 2
+        assert insert.sql in profiler.format_report()
+
+    def test_profile_explain(self, db: src.Database) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        with db.profile(explain=True) as profiler:
+            db.query(Book).filter(name="1984").all()
+
+        # The EXPLAIN statement itself isn't profiled
+        assert len(profiler.statements) == 1
+        assert profiler.statements[0].explain
@@ -0,0 +1,73 @@
+# pylint: disable=W0212
+from pathlib import Path
+from test.dialects import DATABASE, MYSQL_CONFIG, PASSWORD, POSTGRESS_CONFIG, SQLITE_CONFIG, USER
+from typing import Type
+
+import src
+
+
+class TestQueryCache:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def _get_cached_db(self, db_type: Type[src.Database], db_hostname: str) -> src.Database:
+        conn_details = src.DatabaseConfig(host=db_hostname, user=USER, password=PASSWORD, database=DATABASE)
+        return db_type(conn_details, query_cache=src.QueryCache(max_size=8))
+
+    def test_repeated_query_hits_cache(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        db = self._get_cached_db(db_type, db_hostname)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        assert len(db.query(Book).filter(name="1984")) == 1
+        assert len(db.query(Book).filter(name="1984")) == 1
+        assert db.query_cache
+        assert (db.query_cache.hits, db.query_cache.misses) == (1, 1)
+
+        # Each hit returns new instances, so changes to one result don't leak into the cache
+        book = db.query(Book).first()
+        book.name = "Animal Farm"
+        assert db.query(Book).first().name == "1984"
+
+    def test_save_invalidates_cache(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        db = self._get_cached_db(db_type, db_hostname)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        db.create_table(Book)
+        book = Book(name="1984")
+        db.save(book)
+        assert [b.name for b in db.query(Book)] == ["1984"]
+
+        book.name = "Animal Farm"
+        db.save(book)
+        db.save(Book(name="Homage to Catalonia"))
+        assert [b.name for b in db.query(Book)] == ["Animal Farm", "Homage to Catalonia"]
+        assert db.query_cache
+        assert db.query_cache.hits == 0
+
+
+class TestSharedQueryCache:
+    databases = [SQLITE_CONFIG]
+
+    def test_databases_sharing_cache(self, db_type: Type[src.Database], tmp_path: Path) -> None:
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        cache = src.QueryCache()
+        dbs = []
+        for name in ["a", "b"]:
+            conn_details = src.DatabaseConfig(host=str(tmp_path / f"{name}.db"), user="", password="", database="")
+            _db = db_type(conn_details, query_cache=cache)
+            _db.create_table(Book)
+            _db.save(Book(name=f"in {name}"))
+            dbs.append(_db)
+
+        # Each database's rows are cached under its own key
+        assert [[book.name for book in _db.query(Book)] for _db in dbs] == [["in a"], ["in b"]]
+        assert [[book.name for book in _db.query(Book)] for _db in dbs] == [["in a"], ["in b"]]
+        assert (cache.hits, cache.misses) == (2, 2)
@@ -0,0 +1,68 @@
+# pylint: disable=W0212
+from pathlib import Path
+from test.dialects import DATABASE, PASSWORD, SQLITE_CONFIG, USER
+from typing import Type
+
+import pytest
+
+import src
+
+
+class Book(src.BaseModel):
+    name: str = src.CharField(max_length=32)
+
+
+class TestReadReplicas:
+    # Separate SQLite files stand in for the primary and the replicas, without replication between them
+    databases = [SQLITE_CONFIG]
+
+    def _get_replicated_db(
+        self, db_type: Type[src.Database], db_hostname: str, tmp_path: Path, strategy: str = "round_robin"
+    ) -> src.Database:
+        def config(host: str) -> src.DatabaseConfig:
+            return src.DatabaseConfig(host=host, user=USER, password=PASSWORD, database=DATABASE)
+
+        replicas = [config(str(tmp_path / f"replica_{idx}.db")) for idx in range(2)]
+        db = db_type(config(db_hostname), replicas=replicas, replica_strategy=strategy)
+        for idx, node in enumerate([db, *db.replicas]):
+            node.create_table(Book)
+            node.save(Book(name=f"node {idx}"))
+        return db
+
+    def test_reads_round_robin_over_replicas(
+        self, db_type: Type[src.Database], db_hostname: str, tmp_path: Path
+    ) -> None:
+        db = self._get_replicated_db(db_type, db_hostname, tmp_path)
+
+        names = [db.query(Book).first().name for _ in range(4)]
+        assert names == ["node 1", "node 2", "node 1", "node 2"]
+
+    def test_least_busy_replica(self, db_type: Type[src.Database], db_hostname: str, tmp_path: Path) -> None:
+        db = self._get_replicated_db(db_type, db_hostname, tmp_path, strategy="least_busy")
+
+        # The first replica is busy with another read, so the second one is used
+        db._replica_busy[0] = 1
+        assert db.query(Book).first().name == "node 2"
+
+    def test_writes_go_to_primary(self, db_type: Type[src.Database], db_hostname: str, tmp_path: Path) -> None:
+        db = self._get_replicated_db(db_type, db_hostname, tmp_path)
+
+        db.save(Book(name="1984"))
+        assert db._execute_query("SELECT name FROM book ORDER BY id") == [("node 0",), ("1984",)]
+        assert all(len(replica.query(Book)) == 1 for replica in db.replicas)
+
+    def test_read_your_writes(self, db_type: Type[src.Database], db_hostname: str, tmp_path: Path) -> None:
+        db = self._get_replicated_db(db_type, db_hostname, tmp_path)
+
+        with db.read_your_writes():
+            # Reads go to replicas until the thread has written something
+            assert db.query(Book).first().name == "node 1"
+            db.save(Book(name="1984"))
+            assert [b.name for b in db.query(Book)] == ["node 0", "1984"]
+
+        assert db.query(Book).first().name == "node 2"
+
+    def test_invalid_strategy(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(host=db_hostname, user=USER, password=PASSWORD, database=DATABASE)
+        with pytest.raises(ValueError):
+            db_type(conn_details, replica_strategy="random")
@@ -0,0 +1,104 @@
+import io
+import json
+from pathlib import Path
+from test.dialects import DATABASE, PASSWORD, SQLITE_CONFIG, USER
+
+import pytest
+
+import src
+
+
+class Purchase(src.BaseModel):
+    customer: int = src.IntField()
+    item: str = src.CharField(max_length=32)
+
+
+def get_item(purchase: Purchase) -> str:
+    return purchase.item
+
+
+class TestSharding:
+    # Separate SQLite files stand in for the shards
+    databases = [SQLITE_CONFIG]
+
+    def _get_sharded_db(self, db: src.Database, tmp_path: Path) -> src.ShardedDatabase:
+        shards = [db] + [
+            type(db)(
+                src.DatabaseConfig(
+                    host=str(tmp_path / f"shard_{idx}.db"), user=USER, password=PASSWORD, database=DATABASE
+                )
+            )
+            for idx in range(1, 3)
+        ]
+        sharded_db = src.ShardedDatabase(shards, shard_key="customer")
+        sharded_db.create_table(Purchase)
+        for customer, item in [(0, "pen"), (1, "ink"), (2, "paper"), (0, "pencil"), (1, "eraser"), (2, "ruler")]:
+            sharded_db.save(Purchase(customer=customer, item=item))
+        return sharded_db
+
+    def test_save_routes_by_shard_key(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        for idx, shard in enumerate(sharded_db.shards):
+            assert {order.customer for order in shard.query(Purchase)} == {idx}
+
+    def test_query_with_shard_key_reads_one_shard(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        orders = sharded_db.query(Purchase).filter(customer=1)
+        assert [order.item for order in orders] == ["ink", "eraser"]
+
+    def test_query_fans_out_and_merges_by_id(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        orders = sharded_db.query(Purchase).all()
+        first_ids = [1, sharded_db.ids_per_shard + 1, 2 * sharded_db.ids_per_shard + 1]
+        assert [order.id for order in orders] == [first_id + offset for first_id in first_ids for offset in range(2)]
+        assert [order.item for order in orders] == ["pen", "pencil", "ink", "eraser", "paper", "ruler"]
+
+        assert sharded_db.query(Purchase).first().id == 1
+        assert [o.item for o in sharded_db.query(Purchase).filter(item="ruler")] == ["ruler"]
+        sharded_db.close()
+
+    def test_export_merges_shards(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        file = io.StringIO()
+        assert sharded_db.query(Purchase).export(file, "jsonl", chunk_size=4) == 6
+        rows = [json.loads(line) for line in file.getvalue().splitlines()]
+        assert [row["item"] for row in rows] == ["pen", "pencil", "ink", "eraser", "paper", "ruler"]
+
+        file = io.StringIO()
+        assert sharded_db.query(Purchase).filter(customer=2).export(file, "jsonl") == 2
+
+    def test_map_parallel_merges_shards(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        items = list(sharded_db.query(Purchase).map_parallel(get_item, processes=2, chunk_size=4))
+        assert items == ["pen", "pencil", "ink", "eraser", "paper", "ruler"]
+
+    def test_save_model_without_shard_key(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        class Book(src.BaseModel):
+            name: str = src.CharField(max_length=32)
+
+        with pytest.raises(src.InvalidFieldError):
+            sharded_db.save(Book(name="1984"))
+
+    def test_save_existing_model(self, db: src.Database, tmp_path: Path) -> None:
+        sharded_db = self._get_sharded_db(db, tmp_path)
+
+        [ink] = sharded_db.query(Purchase).filter(item="ink")
+        assert sharded_db.get_shard_by_id(ink.id) is sharded_db.shards[1]
+        assert [order.item for order in sharded_db.query(Purchase).filter(id=ink.id)] == ["ink"]
+
+        ink.item = "red ink"
+        sharded_db.save(ink)
+        assert [order.item for order in sharded_db.shards[1].query(Purchase)] == ["red ink", "eraser"]
+
+        # Moving the row to another shard would update the row with the same id there instead
+        ink.customer = 2
+        with pytest.raises(src.ShardKeyChangedError):
+            sharded_db.save(ink)
+        assert [order.item for order in sharded_db.shards[2].query(Purchase)] == ["paper", "ruler"]
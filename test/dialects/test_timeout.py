@@ -0,0 +1,104 @@
+# pylint: disable=W0212
+from test.dialects import DATABASE, MYSQL_CONFIG, PASSWORD, POSTGRESS_CONFIG, SQLITE_CONFIG, USER
+from typing import Type
+
+import pytest
+
+import src
+
+SLOW_QUERIES = {
+    "PostgresDatabase": "SELECT pg_sleep(5);",
+    "MySQLDatabase": (
+        "SELECT COUNT(*) FROM information_schema.columns AS a, information_schema.columns AS b, "
+        "information_schema.columns AS c;"
+    ),
+    "SQLiteDatabase": "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) "
+    "SELECT COUNT(*) FROM c;",
+}
+
+# Statements that run longer than the timeouts of the tests, but that finish on their own
+SLOW_UPDATES = {
+    "PostgresDatabase": "SELECT pg_sleep(0.5);",
+    "MySQLDatabase": "DO SLEEP(0.5);",
+    "SQLiteDatabase": "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000) "
+    "SELECT COUNT(*) FROM c;",
+}
+
+# Reads the timeout setting of the session, for the dialects that have one
+SESSION_TIMEOUT_QUERIES = {
+    "PostgresDatabase": ("SHOW statement_timeout;", [("0",)]),
+    "MySQLDatabase": ("SELECT @@SESSION.max_execution_time;", [(0,)]),
+}
+
+
+class Book(src.BaseModel):
+    name: str = src.CharField(max_length=32)
+
+
+class TestTimeout:
+    databases = [POSTGRESS_CONFIG, MYSQL_CONFIG, SQLITE_CONFIG]
+
+    def test_statement_timeout(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        # A single connection, so the next checkout gets the connection that timed out
+        conn_details = src.DatabaseConfig(
+            host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, minconn=1, maxconn=1
+        )
+        db = db_type(conn_details)
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+
+        with db.statement_timeout(0.2), pytest.raises(src.QueryTimeoutError):
+            db._execute_query(SLOW_QUERIES[db_type.__name__])
+        assert db._get_statement_timeout() == 0
+        assert [book.name for book in db.query(Book)] == ["1984"]
+        # The connection went back to the pool without the timeout
+        if db_type.__name__ in SESSION_TIMEOUT_QUERIES:
+            sql_query, expected = SESSION_TIMEOUT_QUERIES[db_type.__name__]
+            assert db._execute_query(sql_query) == expected
+
+    def test_database_timeout(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(
+            host=db_hostname, user=USER, password=PASSWORD, database=DATABASE, statement_timeout=0.2
+        )
+        db = db_type(conn_details)
+        with pytest.raises(src.QueryTimeoutError):
+            db._execute_query(SLOW_QUERIES[db_type.__name__])
+        # The database's timeout only limits selects, not writes like a long backfill
+        db._execute_update(SLOW_UPDATES[db_type.__name__])
+        # A timeout of zero lifts the database's limit
+        with db.statement_timeout(0):
+            assert db._get_statement_timeout() == 0
+
+    def test_timeout_per_database(self, db_type: Type[src.Database], db_hostname: str) -> None:
+        conn_details = src.DatabaseConfig(host=db_hostname, user=USER, password=PASSWORD, database=DATABASE)
+        db = db_type(conn_details, replicas=[conn_details])
+        other = db_type(conn_details)
+
+        with db.statement_timeout(0.2):
+            with pytest.raises(src.QueryTimeoutError):
+                db._read_rows(SLOW_QUERIES[db_type.__name__], ())
+            assert db.replicas[0]._get_statement_timeout() == 0.2
+            # Another database used in the block keeps its own limit
+            assert other._get_statement_timeout() == 0
+            with other.statement_timeout(0.5):
+                assert (db._get_statement_timeout(), other._get_statement_timeout()) == (0.2, 0.5)
+        assert db._get_statement_timeout() == 0
+
+    def test_query_timeout(self, db: src.Database, monkeypatch: pytest.MonkeyPatch) -> None:
+        db.create_table(Book)
+        db.save(Book(name="1984"))
+        timeouts = []
+        get_statement_timeout = db._get_statement_timeout
+
+        def spy() -> float:
+            timeouts.append(get_statement_timeout())
+            return timeouts[-1]
+
+        monkeypatch.setattr(db, "_get_statement_timeout", spy)
+        query = db.query(Book)
+        timed_query = query.timeout(2.5)
+
+        assert [book.name for book in timed_query] == ["1984"]
+        assert timeouts == [2.5]
+        assert query.filter(name="1984").first().name == "1984"
+        assert timeouts == [2.5, 0]